@@ -0,0 +1,75 @@
+"""
+Micro-benchmark of request encoding, comparing the codec with the previous per-byte implementation.
+
+Usage: python benchmarks/codec.py [--number N]
+"""
+import argparse
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from uhf_reader.codec import checksum, encode_frame, PASSWORD_BANK_PARAM, PASSWORD_BANK_PARAM_COUNT  # noqa: E402
+
+PACKET = bytes(range(32))
+
+
+def legacy_checksum(packet: bytes) -> int:
+    value = 0
+
+    for x in packet:
+        value = value + x
+        if value > 255:
+            value = value.to_bytes(2, byteorder='big')[1]
+
+    value = ((~value) + 1) & 0xff
+
+    if value > 255:
+        value = value.to_bytes(2, byteorder='big')[1]
+
+    return value
+
+
+def legacy_build(command: bytes, args: bytes = b"") -> bytes:
+    length = (len(command) + len(args) + 1).to_bytes(1, byteorder="big")
+    packet = b"\xFF" + length + command + args
+    return b"\x0A" + packet + legacy_checksum(packet).to_bytes(1, byteorder='big')
+
+
+def legacy_password_bank_param(password: int, bank: int, param: int) -> bytes:
+    value = (password >> 24 & 0xff).to_bytes(1, byteorder='big')
+    value += (password >> 16 & 0xff).to_bytes(1, byteorder='big')
+    value += (password >> 8 & 0xff).to_bytes(1, byteorder='big')
+    value += (password & 0xff).to_bytes(1, byteorder='big')
+    value += bank.to_bytes(1, byteorder='big')
+    value += int(param).to_bytes(1, byteorder='big')
+    return value
+
+
+CASES = [
+    ("checksum (32 bytes)", lambda: legacy_checksum(PACKET), lambda: checksum(PACKET)),
+    ("get firmware version frame", lambda: legacy_build(b"\x22"), lambda: encode_frame(b"\x22")),
+    ("secured read frame",
+     lambda: legacy_build(b"\x88", legacy_password_bank_param(0x12345678, 3, 4) + (4).to_bytes(1, byteorder='big')),
+     lambda: encode_frame(b"\x88", PASSWORD_BANK_PARAM_COUNT.pack(0x12345678, 3, 4, 4))),
+    ("secured write frame",
+     lambda: legacy_build(b"\x89", legacy_password_bank_param(0x12345678, 3, 4) + b"\xAB\xCD"),
+     lambda: encode_frame(b"\x89", PASSWORD_BANK_PARAM.pack(0x12345678, 3, 4) + b"\xAB\xCD")),
+]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000)
+    options = parser.parse_args()
+
+    print("{:<28} {:>12} {:>12} {:>8}".format("case", "legacy ns", "codec ns", "speedup"))
+    for name, legacy, current in CASES:
+        legacy_ns = min(timeit.repeat(legacy, number=options.number, repeat=3)) / options.number * 1e9
+        current_ns = min(timeit.repeat(current, number=options.number, repeat=3)) / options.number * 1e9
+        print("{:<28} {:>12.0f} {:>12.0f} {:>7.1f}x".format(name, legacy_ns, current_ns, legacy_ns / current_ns))
+
+
+if __name__ == '__main__':
+    main()
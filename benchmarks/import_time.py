@@ -0,0 +1,53 @@
+"""
+Benchmark of `import uhf_reader` in a fresh interpreter, reporting time on top of bare interpreter startup
+and which heavy dependencies got loaded as a side effect.
+
+Usage: python benchmarks/import_time.py [--number N] [--module MODULE]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+
+HEAVY_MODULES = ('twisted', 'twisted.internet.reactor', 'asyncio', 'concurrent.futures', 'shelve')
+
+
+def startup(code: str, number: int) -> float:
+    """
+    Measure best wall time of running the code in a fresh interpreter
+    """
+    best = None
+    for _ in range(number):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def loaded(module: str):
+    code = "import sys, {}; print(' '.join(name for name in {!r} if name in sys.modules))".format(
+        module, HEAVY_MODULES)
+    output = subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True, stdout=subprocess.PIPE)
+    return output.stdout.decode().split()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=20)
+    parser.add_argument('--module', default='uhf_reader')
+    options = parser.parse_args()
+
+    baseline = startup("pass", options.number)
+    total = startup("import " + options.module, options.number)
+
+    print("interpreter startup  {:8.1f} ms".format(baseline * 1e3))
+    print("import {:<13} {:8.1f} ms".format(options.module, (total - baseline) * 1e3))
+    print("heavy modules loaded: {}".format(", ".join(loaded(options.module)) or "none"))
+
+
+if __name__ == '__main__':
+    main()
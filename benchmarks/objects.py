@@ -0,0 +1,152 @@
+"""
+Micro-benchmark of request and response objects, comparing slotted lazily decoded classes with the previous
+per-instance `__dict__` implementation in time and allocations per operation.
+
+Usage: python benchmarks/objects.py [--number N]
+"""
+import argparse
+import os
+import sys
+import timeit
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+from uhf_reader.codec import checksum, encode_frame, PASSWORD_BANK_PARAM_COUNT  # noqa: E402
+from uhf_reader.request import Gen2SecuredReadRequest, GetFirmwareVersionRequest  # noqa: E402
+from uhf_reader.response import Gen2SecuredReadResponse, GetFirmwareVersionResponse  # noqa: E402
+
+
+def response_frame(payload: bytes) -> bytes:
+    frame = bytes((0x0b, 0xff, len(payload) + 2, 0x00)) + payload
+    return frame + bytes((checksum(frame),))
+
+
+READ_RESPONSE = response_frame(b"\x01" + bytes(range(8)))
+FIRMWARE_RESPONSE = response_frame(b"\x06\x03")
+
+
+class LegacyRequest:
+    def __init__(self, command: bytes, args: bytes = b"") -> None:
+        self.command = command
+        self.args = args
+
+        if len(self.command) > 1:
+            raise ValueError("command must be 1 byte long")
+
+        self.deferred = None
+        self.priority = 1
+        self.deadline = None
+        self.queued_at = None
+        self.sent_at = None
+        self.received_at = None
+        self.data = self.build()
+
+    def build(self) -> bytes:
+        return encode_frame(self.command, self.args)
+
+
+class LegacyReadRequest(LegacyRequest):
+    def __init__(self, password: int = 0, bank: int = 1, addr: int = 0, count: int = 4) -> None:
+        args = PASSWORD_BANK_PARAM_COUNT.pack(password & 0xffffffff, bank, addr, count)
+        self.addr = addr
+        self.count = count
+        super().__init__(b"\x88", args)
+
+
+class LegacyFirmwareRequest(LegacyRequest):
+    def __init__(self) -> None:
+        super().__init__(b"\x22")
+
+
+class LegacyResponse:
+    def __init__(self, data: bytes) -> None:
+        self.data = data
+        self.addr = data[1]
+        self.length = data[2]
+        self.status = data[3]
+        self.payload = data[4:-1]
+        self.checksum = data[-1]
+        if checksum(self.data[:-1]) != self.checksum:
+            raise ValueError("invalid checksum")
+
+    def value(self):
+        return self.payload
+
+
+class LegacyReadResponse(LegacyResponse):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.payload = self.payload[1:]
+
+
+class LegacyFirmwareResponse(LegacyResponse):
+    def __init__(self, data: bytes) -> None:
+        super().__init__(data)
+        self.major = self.payload[0]
+        self.minor = self.payload[1]
+
+    def value(self):
+        return self.major, self.minor
+
+
+CASES = [
+    ("secured read request", lambda: LegacyReadRequest(password=0x12345678, bank=3, addr=4),
+     lambda: Gen2SecuredReadRequest(password=0x12345678, bank=3, addr=4)),
+    ("firmware version request", lambda: LegacyFirmwareRequest(), lambda: GetFirmwareVersionRequest()),
+    ("secured read response", lambda: LegacyReadResponse(READ_RESPONSE).value(),
+     lambda: Gen2SecuredReadResponse(READ_RESPONSE).value()),
+    ("firmware version response", lambda: LegacyFirmwareResponse(FIRMWARE_RESPONSE).value(),
+     lambda: GetFirmwareVersionResponse(FIRMWARE_RESPONSE).value()),
+]
+
+
+def retained(operation, number: int) -> float:
+    """
+    Measure bytes allocated per operation and still referenced by its result, e.g. a queued request
+    """
+    results = [None] * number
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for i in range(number):
+        results[i] = operation()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return (after - before) / number
+
+
+def peak(operation, number: int) -> float:
+    """
+    Measure peak of memory allocated per operation whose result is dropped right away
+    """
+    operation()
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    base = tracemalloc.get_traced_memory()[0]
+    for _ in range(number):
+        operation()
+    result = tracemalloc.get_traced_memory()[1] - base
+    tracemalloc.stop()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--number', type=int, default=100000)
+    options = parser.parse_args()
+
+    print("{:<28} {:>10} {:>10} {:>10} {:>10} {:>10} {:>10}".format(
+        "case", "legacy ns", "ns", "legacy B", "B", "legacy pk", "pk"))
+    for name, legacy, current in CASES:
+        legacy_ns = min(timeit.repeat(legacy, number=options.number, repeat=3)) / options.number * 1e9
+        current_ns = min(timeit.repeat(current, number=options.number, repeat=3)) / options.number * 1e9
+        print("{:<28} {:>10.0f} {:>10.0f} {:>10.1f} {:>10.1f} {:>10} {:>10}".format(
+            name, legacy_ns, current_ns, retained(legacy, options.number), retained(current, options.number),
+            peak(legacy, options.number), peak(current, options.number)))
+
+    print("\nns: time per operation, B: bytes per operation kept alive by its result, "
+          "pk: peak bytes of a single operation whose result is dropped")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,303 @@
+"""
+Benchmark suite of the codec and the transports, saving results to JSON and comparing them with a baseline.
+
+Micro-benchmarks time checksum calculation, request encoding and parsing of every response class.
+Macro-benchmarks measure throughput and latency percentiles of sequential requests sent by `UHFReader` and
+the Twisted `AsyncUHFReader` to the reader simulator, run in a separate process on loopback.
+
+A benchmark regresses when its throughput drops, or its p99 latency grows, by more than the threshold
+relative to the baseline. Baselines are machine specific, record one with `--save-baseline` on the machine
+used for comparisons.
+
+Usage: python benchmarks/suite.py [--only PATTERN] [--output FILE] [--baseline FILE] [--save-baseline]
+                                  [--threshold RATIO] [--threshold-for PATTERN=RATIO] [--requests N]
+"""
+import argparse
+import fnmatch
+import json
+import os
+import platform
+import socket
+import subprocess
+import sys
+import time
+import timeit
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)
+sys.path.insert(0, ROOT)
+
+from uhf_reader.codec import checksum  # noqa: E402
+from uhf_reader.packet import UHFPacket  # noqa: E402
+from uhf_reader.request import UHFRequest, GetFirmwareVersionRequest, Gen2SecuredReadRequest, \
+    Gen2SecuredWriteRequest  # noqa: E402
+from uhf_reader.response import UHFResponse, GetFirmwareVersionResponse, GetRadioPowerResponse, \
+    GetRadioFrequencyResponse, Gen2SecuredReadResponse  # noqa: E402
+from uhf_reader.constants import GEN2_SECURED_READ, USER  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+
+def response_frame(payload: bytes) -> bytes:
+    frame = bytes((0x0b, 0xff, len(payload) + 2, 0x00)) + payload
+    return frame + bytes((checksum(frame),))
+
+
+PACKET = bytes(range(32))
+READ_ARGS = bytes((0x12, 0x34, 0x56, 0x78, USER, 4, 4))
+
+# Response frames as sent by the reader, with antenna number preceding data read
+RESPONSES = [
+    (UHFResponse, response_frame(b"")),
+    (GetFirmwareVersionResponse, response_frame(b"\x06\x03")),
+    (GetRadioPowerResponse, response_frame(b"\x14\x02\x20\x00")),
+    (GetRadioFrequencyResponse, response_frame(b"\x00\x03")),
+    (Gen2SecuredReadResponse, response_frame(b"\x01" + bytes(range(8)))),
+]
+
+MICRO_CASES = [
+    ("micro.checksum", lambda: UHFPacket.calculate_checksum(PACKET)),
+    ("micro.encode", lambda: UHFRequest.encode(GEN2_SECURED_READ, READ_ARGS)),
+    ("micro.request.firmware_version", lambda: GetFirmwareVersionRequest()),
+    ("micro.request.secured_read", lambda: Gen2SecuredReadRequest(password=0x12345678, bank=USER, addr=4)),
+    ("micro.request.secured_write", lambda: Gen2SecuredWriteRequest(b"\xab\xcd", bank=USER, addr=4)),
+] + [("micro.parse." + cls.__name__, lambda cls=cls, frame=frame: cls(frame).value()) for cls, frame in RESPONSES]
+
+
+def percentile(samples, fraction: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(int(len(ordered) * fraction), len(ordered) - 1)]
+
+
+def latency_result(samples) -> dict:
+    """
+    Summarize latencies of sequential operations in seconds
+    """
+    return {'ops_per_sec': len(samples) / sum(samples),
+            'p50_us': percentile(samples, 0.5) * 1e6,
+            'p99_us': percentile(samples, 0.99) * 1e6}
+
+
+def run_micro(operation, number: int, repeat: int = 7) -> dict:
+    # Single operations are too short to time one by one, the best batch is the least disturbed one
+    best = min(timeit.repeat(operation, number=number, repeat=repeat)) / number
+    return {'ops_per_sec': 1.0 / best, 'ns_per_op': best * 1e9}
+
+
+class Simulator:
+    """
+    Reader simulator serving on a free loopback port in a child process, so it does not compete with
+    the measured client for the interpreter lock
+    """
+    def __init__(self) -> None:
+        with socket.socket() as probe:
+            probe.bind(('127.0.0.1', 0))
+            self.port = probe.getsockname()[1]
+        self.process = subprocess.Popen([sys.executable, '-m', 'uhf_reader.simulator', '--port', str(self.port)],
+                                        cwd=ROOT, stderr=subprocess.DEVNULL)
+
+        deadline = time.monotonic() + 10.0
+        while True:
+            try:
+                socket.create_connection(('127.0.0.1', self.port), timeout=1.0).close()
+                return
+            except OSError:
+                if time.monotonic() > deadline:
+                    self.close()
+                    raise
+                time.sleep(0.05)
+
+    def close(self) -> None:
+        self.process.terminate()
+        self.process.wait()
+
+    def __enter__(self) -> 'Simulator':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+
+MACRO_OPERATIONS = ('firmware_version', 'secured_read')
+SYNC_CASES = ['macro.sync.' + operation for operation in MACRO_OPERATIONS]
+TWISTED_CASES = ['macro.twisted.' + operation for operation in MACRO_OPERATIONS]
+
+
+def run_sync(port: int, requests: int, selected) -> dict:
+    from uhf_reader import UHFReader
+
+    reader = UHFReader(host='127.0.0.1', port=port)
+    operations = {
+        'firmware_version': lambda: reader.get_fw_version(refresh=True),
+        'secured_read': lambda: reader.gen2_sec_read(bank=USER, addr=0, count=8),
+    }
+    results = {}
+
+    reader.connect()
+    try:
+        for name, operation in zip(SYNC_CASES, MACRO_OPERATIONS):
+            if not selected(name):
+                continue
+            operation = operations[operation]
+            # Warm up connection and caches of the interpreter
+            for _ in range(requests // 10):
+                operation()
+            samples = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                operation()
+                samples.append(time.perf_counter() - started)
+            results[name] = latency_result(samples)
+    finally:
+        reader.disconnect()
+    return results
+
+
+def run_twisted(port: int, requests: int, selected) -> dict:
+    from twisted.internet import defer, reactor
+    from twisted.python.failure import Failure
+    from uhf_reader import AsyncUHFReader
+    from uhf_reader.factory import UHFReaderClientFactory
+    from uhf_reader.protocol import UHFReaderProtocolBase
+
+    factory = UHFReaderClientFactory.forProtocol(UHFReaderProtocolBase)
+    reader = AsyncUHFReader(queue=factory.getQueue("127.0.0.1:{}".format(port)))
+    operations = {
+        'firmware_version': lambda: reader.get_fw_version(refresh=True),
+        'secured_read': lambda: reader.gen2_sec_read_ex(bank=USER, addr=0, count=8),
+    }
+    results = {}
+    failures = []
+
+    @defer.inlineCallbacks
+    def measure():
+        for name, operation in zip(TWISTED_CASES, MACRO_OPERATIONS):
+            if not selected(name):
+                continue
+            operation = operations[operation]
+            for _ in range(requests // 10):
+                yield operation()
+            samples = []
+            for _ in range(requests):
+                started = time.perf_counter()
+                yield operation()
+                samples.append(time.perf_counter() - started)
+            results[name] = latency_result(samples)
+
+    def finish(result):
+        if isinstance(result, Failure):
+            failures.append(result)
+        factory.stopTrying()
+        connector.disconnect()
+        reactor.callLater(0, reactor.stop)
+
+    connector = reactor.connectTCP('127.0.0.1', port, factory)
+    reactor.callWhenRunning(lambda: measure().addBoth(finish))
+    reactor.run()
+
+    if failures:
+        failures[0].raiseException()
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, overrides) -> list:
+    """
+    Find benchmarks regressed relative to the baseline
+    :return: list of (name, metric, baseline value, current value, allowed ratio) tuples
+    """
+    regressions = []
+    for name, current in sorted(results.items()):
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+
+        allowed = threshold
+        for pattern, value in overrides:
+            if fnmatch.fnmatch(name, pattern):
+                allowed = value
+
+        if current['ops_per_sec'] < previous['ops_per_sec'] * (1 - allowed):
+            regressions.append((name, 'ops_per_sec', previous['ops_per_sec'], current['ops_per_sec'], allowed))
+        if 'p99_us' in current and current['p99_us'] > previous['p99_us'] * (1 + allowed):
+            regressions.append((name, 'p99_us', previous['p99_us'], current['p99_us'], allowed))
+    return regressions
+
+
+def parse_override(value: str):
+    pattern, _, ratio = value.partition('=')
+    try:
+        return pattern, float(ratio)
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected PATTERN=RATIO, got {!r}".format(value))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--only', action='append', default=[], metavar='PATTERN',
+                        help="run benchmarks matching the glob pattern, e.g. 'micro.*', may be repeated")
+    parser.add_argument('--number', type=int, default=50000, help="operations per micro-benchmark batch")
+    parser.add_argument('--requests', type=int, default=2000, help="requests per macro-benchmark")
+    parser.add_argument('--output', help="write results to JSON file")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="baseline JSON file")
+    parser.add_argument('--save-baseline', action='store_true', help="store results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help="allowed relative throughput drop or p99 latency growth")
+    parser.add_argument('--threshold-for', action='append', default=[], type=parse_override,
+                        metavar='PATTERN=RATIO', help="threshold of benchmarks matching the glob pattern")
+    options = parser.parse_args()
+
+    def selected(name: str) -> bool:
+        return not options.only or any(fnmatch.fnmatch(name, pattern) for pattern in options.only)
+
+    results = {}
+    for name, operation in MICRO_CASES:
+        if selected(name):
+            results[name] = run_micro(operation, options.number)
+
+    if any(selected(name) for name in SYNC_CASES + TWISTED_CASES):
+        with Simulator() as simulator:
+            results.update(run_sync(simulator.port, options.requests, selected))
+            # The reactor can not be restarted, Twisted benchmarks run last
+            if any(selected(name) for name in TWISTED_CASES):
+                results.update(run_twisted(simulator.port, options.requests, selected))
+
+    print("{:<40} {:>12} {:>12} {:>12} {:>12}".format("benchmark", "ops/s", "ns/op", "p50 us", "p99 us"))
+    for name, result in sorted(results.items()):
+        if 'ns_per_op' in result:
+            print("{:<40} {:>12.0f} {:>12.0f}".format(name, result['ops_per_sec'], result['ns_per_op']))
+        else:
+            print("{:<40} {:>12.0f} {:>12} {:>12.2f} {:>12.2f}".format(
+                name, result['ops_per_sec'], "", result['p50_us'], result['p99_us']))
+
+    report = {'meta': {'python': platform.python_version(), 'platform': platform.platform(),
+                       'machine': platform.node(), 'time': time.strftime('%Y-%m-%dT%H:%M:%S')},
+              'results': results}
+    if options.output:
+        with open(options.output, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+    if options.save_baseline:
+        with open(options.baseline, 'w') as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+        print("\nbaseline saved to {}".format(options.baseline))
+        return
+
+    if not os.path.exists(options.baseline):
+        print("\nno baseline at {}, run with --save-baseline to record one".format(options.baseline))
+        return
+
+    with open(options.baseline) as file:
+        baseline = json.load(file)
+    regressions = compare(results, baseline['results'], options.threshold, options.threshold_for)
+    if not regressions:
+        print("\nno regressions against baseline from {}".format(baseline['meta']['time']))
+        return
+
+    print("\nregressions against baseline from {}:".format(baseline['meta']['time']))
+    for name, metric, previous, current, allowed in regressions:
+        print("  {:<40} {:<12} {:>12.2f} -> {:>12.2f} (allowed {:.0%})".format(name, metric, previous, current,
+                                                                               allowed))
+    sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
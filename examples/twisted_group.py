@@ -0,0 +1,32 @@
+import logging
+import binascii
+import uhf_reader
+
+from twisted.internet import reactor
+
+# Readers covering the same station
+UHF_READERS = [("172.16.50.20", 100), ("172.16.50.21", 100)]
+
+logging.basicConfig(format='%(asctime)-15s %(levelname)-8s %(module)-15s %(message)s')
+logging.getLogger().setLevel(logging.INFO)
+
+reader = None
+
+
+def sendTestRequests():
+    for _ in range(10):
+        deferred = reader.gen2_sec_read_ex(bank=uhf_reader.TID, addr=0, count=8)
+        deferred.addCallbacks(lambda result: print(binascii.hexlify(result)),
+                              lambda err: print(err))
+
+
+if __name__ == '__main__':
+    factory = uhf_reader.factory.UHFReaderClientFactory.forProtocol(uhf_reader.protocol.UHFReaderProtocolBase)
+    # Requests go to the least loaded connected reader of the group
+    group = factory.getGroup("station", ["{}:{}".format(host, port) for host, port in UHF_READERS])
+    reader = uhf_reader.AsyncUHFReader(queue=group)
+
+    for host, port in UHF_READERS:
+        reactor.connectTCP(host, port, factory)
+    reactor.callLater(5, sendTestRequests)
+    reactor.run()
@@ -0,0 +1,81 @@
+import unittest
+
+from unittest import mock
+
+from twisted.internet import defer
+from twisted.python import threadable
+
+from uhf_reader.exceptions import RequestExpiredException
+from uhf_reader.request import GetFirmwareVersionRequest
+from uhf_reader.request_queue import UHFRequestQueue
+
+
+def make_request(deadline: float = None) -> GetFirmwareVersionRequest:
+    request = GetFirmwareVersionRequest()
+    request.deferred = defer.Deferred()
+    request.deadline = deadline
+    return request
+
+
+def make_expiring_request(deadline: float) -> GetFirmwareVersionRequest:
+    request = make_request(deadline)
+    request.deferred.addErrback(lambda failure: failure.trap(RequestExpiredException))
+    return request
+
+
+class BoundedQueueTest(unittest.TestCase):
+    def setUp(self) -> None:
+        # Requests are submitted from the test thread as if it ran the reactor
+        threadable.registerAsIOThread()
+        self.now = 100.0
+        patcher = mock.patch('uhf_reader.request_queue.time.monotonic', lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.queue = UHFRequestQueue(high_water=2)
+
+    def test_held_request_released_after_expired_requests_dropped(self) -> None:
+        expired = [make_expiring_request(self.now + 1.0) for _ in range(2)]
+        for request in expired:
+            self.queue.put(request)
+        held = make_request()
+        self.queue.put(held)
+        self.assertTrue(self.queue.full())
+        capacity = self.queue.wait_capacity()
+
+        # Deadlines pass before the expiration timers run
+        self.now += 2.0
+        dispatched = []
+        self.queue.get().addCallback(dispatched.append)
+
+        self.assertEqual(dispatched, [held])
+        self.assertFalse(self.queue.full())
+        self.assertTrue(capacity.called)
+        for request in expired:
+            self.assertTrue(request.deferred.called)
+
+    def test_get_nowait_releases_held_request(self) -> None:
+        for _ in range(2):
+            self.queue.put(make_expiring_request(self.now + 1.0))
+        held = make_request()
+        self.queue.put(held)
+
+        self.now += 2.0
+        self.assertIs(self.queue.get_nowait(), held)
+
+    def test_waiting_consumer_gets_held_requests_first(self) -> None:
+        first, second, held = make_request(), make_request(), make_request()
+        for request in (first, second, held):
+            self.queue.put(request)
+
+        dispatched = []
+        for _ in range(3):
+            self.queue.get().addCallback(dispatched.append)
+        later = make_request()
+        self.queue.put(later)
+        self.queue.get().addCallback(dispatched.append)
+
+        self.assertEqual(dispatched, [first, second, held, later])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,16 +2,70 @@
 from .constants import RADIO_FREQUENCY_CHINA, RADIO_FREQUENCY_USA, RADIO_FREQUENCY_EUROPE, RADIO_FREQUENCY_CUSTOM
 from .constants import RESERVED, EPC, TID, USER
 from .constants import UNLOCK, UNLOCK_FOREVER, SECURE_LOCK, LOCK_FOREVER
+from .constants import PRIORITY_HIGH, PRIORITY_NORMAL, PRIORITY_LOW
+from .constants import TAG_ARRIVED, TAG_DEPARTED
 
 # Exceptions
 from .exceptions import InvalidParameterException, InvalidChecksumException, ErrorResponseException, \
-    InvalidPacketException, NetworkException
+    InvalidPacketException, NetworkException, VerificationException, RequestExpiredException, \
+    QueueFullException, ReceiveTimeoutException
 
 # Classes
-from .uhf_reader import UHFReader, AsyncUHFReader
+from .uhf_reader import UHFReader, ManagedUHFReader, AsyncUHFReader
+from .cache import ReaderConfigCache, TagBlockCache
+from .metrics import UHFMetrics, MetricsSink, PrometheusSink
+from .retry import RetryPolicy
+from .tag_store import TagStore, TagSnapshot
+from .watch import TagEvent, TagWatcher
 
-try:
-    import uhf_reader.factory
-    import uhf_reader.protocol
-except ImportError:
-    pass
+# Integrations pulling in asyncio, Twisted or other heavy dependencies are imported on first access,
+# so `import uhf_reader` stays fast and does not install the Twisted reactor
+LAZY_ATTRIBUTES = {
+    'AsyncioUHFReader': 'asyncio_reader',
+    'ReaderFleet': 'fleet',
+    'FleetResult': 'fleet',
+    'BulkEncoder': 'encoding',
+    'EncodingJob': 'encoding',
+    'EncodingJournal': 'encoding',
+    'EncodingStats': 'encoding',
+    'read_jobs_csv': 'encoding',
+}
+LAZY_MODULES = ('factory', 'protocol', 'request_queue', 'reader_group', 'asyncio_reader', 'fleet', 'encoding',
+                'simulator')
+
+
+# Star import exports the eagerly imported names only, lazy integrations must be imported by name
+__all__ = [
+    'RADIO_FREQUENCY_CHINA', 'RADIO_FREQUENCY_USA', 'RADIO_FREQUENCY_EUROPE', 'RADIO_FREQUENCY_CUSTOM',
+    'RESERVED', 'EPC', 'TID', 'USER',
+    'UNLOCK', 'UNLOCK_FOREVER', 'SECURE_LOCK', 'LOCK_FOREVER',
+    'PRIORITY_HIGH', 'PRIORITY_NORMAL', 'PRIORITY_LOW',
+    'TAG_ARRIVED', 'TAG_DEPARTED',
+    'InvalidParameterException', 'InvalidChecksumException', 'ErrorResponseException', 'InvalidPacketException',
+    'NetworkException', 'VerificationException', 'RequestExpiredException', 'QueueFullException',
+    'ReceiveTimeoutException',
+    'UHFReader', 'ManagedUHFReader', 'AsyncUHFReader',
+    'ReaderConfigCache', 'TagBlockCache',
+    'UHFMetrics', 'MetricsSink', 'PrometheusSink',
+    'RetryPolicy',
+    'TagStore', 'TagSnapshot',
+    'TagEvent', 'TagWatcher',
+]
+
+
+def __getattr__(name):
+    import importlib
+
+    if name in LAZY_ATTRIBUTES:
+        value = getattr(importlib.import_module('.' + LAZY_ATTRIBUTES[name], __name__), name)
+    elif name in LAZY_MODULES:
+        value = importlib.import_module('.' + name, __name__)
+    else:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(LAZY_ATTRIBUTES) | set(LAZY_MODULES))
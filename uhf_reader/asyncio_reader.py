@@ -0,0 +1,381 @@
+import asyncio
+import logging
+import os
+import time
+
+from typing import Tuple, Any, AsyncIterator, Callable
+
+from .decoder import UHFFrameDecoder
+from .request import UHFRequest, GetFirmwareVersionRequest, ResetReaderRequest, SetRadioPowerRequest, \
+    GetRadioPowerRequest, SetRadioFrequencyRequest, GetRadioFrequencyRequest, Gen2SecuredReadRequest, \
+    Gen2SecuredWriteRequest, Gen2SecuredLockRequest
+from .exceptions import NetworkException, InvalidParameterException, RequestTimeoutException, ErrorResponseException
+from .retry import DEFAULT_RETRY_POLICY
+from .planner import plan_reads
+from .watch import TagEvent, TagWatcher
+from .constants import RADIO_FREQUENCY_EUROPE, USER, EPC, UNLOCK, STATUS_NO_TAG, EPC_WORD_OFFSET, DEFAULT_READ_WORDS
+
+
+class AsyncioUHFReaderProtocol(asyncio.Protocol):
+    """
+    asyncio protocol delivering decoded response frames to the waiting request
+    """
+    def __init__(self, reader: 'AsyncioUHFReader') -> None:
+        self.reader = reader
+        self.transport = None
+        self.decoder = UHFFrameDecoder()
+        self.future = None
+
+    def connection_made(self, transport) -> None:
+        self.transport = transport
+
+    def data_received(self, data: bytes) -> None:
+        self.decoder.feed(data)
+        for frame in self.decoder.frames():
+            future, self.future = self.future, None
+            if future is None or future.done():
+                self.reader.logger.warning("Discarding unsolicited response: %s", frame)
+                continue
+            future.set_result(frame)
+
+    def connection_lost(self, exc) -> None:
+        future, self.future = self.future, None
+        if future is not None and not future.done():
+            future.set_exception(NetworkException("connection lost: " + str(exc)))
+        self.reader.connection_lost(self)
+
+
+class AsyncioUHFReader:
+    """
+    Asynchronous TCP client implementation for asyncio.
+
+    Requests to one reader are serialized, while any number of readers may share a single event loop.
+    Lost connections are re-established in background using exponential backoff.
+    """
+    timeout = 5.0
+    host = None
+    port = 100
+    reconnect = True
+    initial_delay = 1.0
+    factor = 1.5
+    max_delay = 5.0
+    metrics = None
+    retry_policy = DEFAULT_RETRY_POLICY
+    read_words = DEFAULT_READ_WORDS
+
+    def __init__(self, *args, **kwargs):
+        if len(kwargs):
+            self.timeout = kwargs.get('timeout', self.timeout)
+            self.host = kwargs.get('host', self.host)
+            self.port = kwargs.get('port', self.port)
+            self.reconnect = kwargs.get('reconnect', self.reconnect)
+            self.initial_delay = kwargs.get('initial_delay', self.initial_delay)
+            self.factor = kwargs.get('factor', self.factor)
+            self.max_delay = kwargs.get('max_delay', self.max_delay)
+            self.metrics = kwargs.get('metrics', self.metrics)
+            self.retry_policy = kwargs.get('retry_policy', self.retry_policy)
+            self.read_words = kwargs.get('read_words', self.read_words)
+
+        self.logger = logging.getLogger(__name__)
+        self.protocol = None
+        self.closing = False
+        self.reconnect_task = None
+        self.connected = asyncio.Event()
+        self.lock = asyncio.Lock()
+
+    async def connect(self) -> None:
+        """
+        Open connection to the reader
+        """
+        self.closing = False
+        loop = asyncio.get_event_loop()
+        try:
+            _, protocol = await asyncio.wait_for(
+                loop.create_connection(lambda: AsyncioUHFReaderProtocol(self), self.host, self.port),
+                self.timeout)
+        except Exception as exc:
+            raise NetworkException("failed to connect: " + str(exc))
+
+        self.protocol = protocol
+        self.connected.set()
+        self.logger.info("Connected to UHF reader %s:%s", self.host, self.port)
+
+    async def disconnect(self) -> None:
+        """
+        Close connection to the reader and stop reconnecting
+        """
+        self.closing = True
+        if self.reconnect_task is not None:
+            self.reconnect_task.cancel()
+            self.reconnect_task = None
+        if self.protocol is not None:
+            self.protocol.transport.close()
+
+    def connection_lost(self, protocol: AsyncioUHFReaderProtocol) -> None:
+        if protocol is not self.protocol:
+            return
+
+        self.protocol = None
+        self.connected.clear()
+
+        if self.closing:
+            return
+
+        self.logger.error("Lost connection to UHF reader %s:%s", self.host, self.port)
+        if self.reconnect and self.reconnect_task is None:
+            self.reconnect_task = asyncio.ensure_future(self.__reconnect())
+
+    async def __reconnect(self) -> None:
+        delay = self.initial_delay
+        try:
+            while not self.closing:
+                await asyncio.sleep(delay)
+                try:
+                    await self.connect()
+                    return
+                except NetworkException as exc:
+                    self.logger.error("Connection to UHF reader failed. Reason: %s", exc)
+                    delay = min(delay * self.factor, self.max_delay)
+        finally:
+            self.reconnect_task = None
+
+    async def __get_protocol(self, timeout: float) -> AsyncioUHFReaderProtocol:
+        try:
+            await asyncio.wait_for(self.connected.wait(), timeout)
+        except asyncio.TimeoutError:
+            raise NetworkException("not connected")
+        return self.protocol
+
+    async def send_request(self, request: UHFRequest) -> None:
+        """
+        Send request to the reader without waiting for response
+        :param request: :class:`UHFRequest`
+        """
+        async with self.lock:
+            protocol = await self.__get_protocol(self.timeout)
+            protocol.transport.write(request.data)
+
+    async def send_request_return_response(self, request: UHFRequest, timeout: float = None) -> Any:
+        """
+        Send request to the reader and wait for its response
+        :param request: :class:`UHFRequest`
+        :param timeout: Timeout for this request, defaults to reader timeout
+        :raises: :class:`RequestTimeoutException`, :class:`NetworkException`
+        """
+        if timeout is None:
+            timeout = self.timeout
+
+        metrics = self.metrics
+        if metrics is not None:
+            metrics.request_queued(request)
+
+        async with self.lock:
+            loop = asyncio.get_event_loop()
+            deadline = loop.time() + timeout
+            protocol = await self.__get_protocol(timeout)
+
+            future = loop.create_future()
+            protocol.future = future
+            if metrics is not None:
+                metrics.request_sent(request)
+            protocol.transport.write(request.data)
+
+            try:
+                frame = await asyncio.wait_for(future, max(deadline - loop.time(), 0))
+            except asyncio.TimeoutError:
+                # A late response can not be told apart from the next one, resynchronize by reconnecting
+                self.logger.error("Request %s timed out", request)
+                protocol.future = None
+                protocol.transport.abort()
+                exc = RequestTimeoutException(request)
+                if metrics is not None:
+                    metrics.request_failed(request, exc)
+                raise exc
+
+        if metrics is None:
+            return request.parse_response(frame).value()
+
+        metrics.response_received(request)
+        try:
+            value = request.parse_response(frame).value()
+        except Exception as exc:
+            metrics.request_failed(request, exc)
+            raise
+        metrics.response_parsed(request)
+        return value
+
+    async def __send_chunk(self, request: UHFRequest) -> Any:
+        attempt = 0
+        while True:
+            try:
+                return await self.send_request_return_response(request)
+            except ErrorResponseException as exc:
+                if self.retry_policy is None or not self.retry_policy.retryable(exc, attempt):
+                    raise
+                await asyncio.sleep(self.retry_policy.delay(attempt))
+                attempt += 1
+
+    async def get_fw_version(self) -> Tuple[int, int]:
+        """
+        Gets reader firmware version
+        :return: tuple with major & minor version, e.g. `(6, 3)`
+        """
+        return await self.send_request_return_response(GetFirmwareVersionRequest())
+
+    async def reset_reader(self) -> None:
+        """
+        Reset the reader
+        """
+        await self.send_request(ResetReaderRequest())
+
+    async def set_rf_power(self, power1: int = 20, power2: int = 2, power3: int = 32, power4: int = 0) -> None:
+        """
+        Set RF transmit power in dBm for reader antennas (0-30 dBm). Not all antennas may be present.
+        :param power1: Power for the first antenna
+        :param power2: Power for the second antenna
+        :param power3: Power for the third antenna
+        :param power4: Power for the fourth antenna
+        """
+        await self.send_request_return_response(SetRadioPowerRequest(power1=power1, power2=power2,
+                                                                     power3=power3, power4=power4))
+
+    async def get_rf_power(self) -> Tuple[int, int, int, int]:
+        """
+        Get RF transmit power setting for reader antennas (0-30 dBm). Not all antennas may be present.
+        :return: tuple with current RF transmit power for each antenna, e.g. `(20, 2, 30, 0)`
+        """
+        return await self.send_request_return_response(GetRadioPowerRequest())
+
+    async def set_rf_channel(self, region: int = RADIO_FREQUENCY_EUROPE) -> None:
+        """
+        Set RF frequency region to operate
+        :param region: `RADIO_FREQUENCY_CHINA`, `RADIO_FREQUENCY_USA` or `RADIO_FREQUENCY_EUROPE`
+        """
+        await self.send_request_return_response(SetRadioFrequencyRequest(region))
+
+    async def get_rf_channel(self) -> int:
+        """
+        Get current RF frequency region setting
+        :return: `RADIO_FREQUENCY_CHINA`, `RADIO_FREQUENCY_USA`, `RADIO_FREQUENCY_EUROPE` or `RADIO_FREQUENCY_CUSTOM`
+        """
+        return await self.send_request_return_response(GetRadioFrequencyRequest())
+
+    async def gen2_sec_lock(self, password: int = 0, bank: int = USER, level: int = UNLOCK) -> None:
+        """
+        Lock/unlock given memory bank using specified locking level
+        :param password: Access password
+        :param bank: Memory bank to lock/unlock (`RESERVED`, `EPC`, `TID`, `USER`)
+        :param level: Lock level (`UNLOCK`, `UNLOCK_FOREVER`, `SECURE_LOCK`, `LOCK_FOREVER`)
+        """
+        await self.send_request_return_response(Gen2SecuredLockRequest(password=password, bank=bank, level=level))
+
+    async def gen2_sec_write(self, data: bytes, password: int = 0, bank: int = USER,
+                             progress: Callable[[int, int], None] = None) -> None:
+        """
+        Write data to given memory bank. Words failing with transient tag errors are retried
+        according to `retry_policy`.
+        :param data: Data to write
+        :param password: Access password
+        :param bank: Memory bank to write into (`RESERVED`, `EPC`, `TID`, `USER`)
+        :param progress: Called with bytes written so far and total bytes after each written word
+        """
+        if len(data) == 0:
+            return
+        if len(data) % 2 != 0:
+            data += b"\x00"
+        chunks = [data[i:i + 2] for i in range(0, len(data), 2)]
+        for idx, chunk in enumerate(chunks):
+            await self.__send_chunk(Gen2SecuredWriteRequest(chunk, password=password, bank=bank, addr=idx))
+            if progress is not None:
+                progress((idx + 1) * 2, len(data))
+
+    async def gen2_sec_read(self, password: int = 0, bank: int = EPC, addr: int = 0, count: int = 16,
+                            progress: Callable[[int, int], None] = None) -> bytes:
+        """
+        Read data from given memory bank in requests of up to `read_words` words. Chunks failing with transient
+        tag errors are retried according to `retry_policy`. If the reader or tag rejects reads that large, the
+        rest is read with requests half the size, which are used for subsequent reads once the whole read
+        succeeded.
+        :param password: Access password
+        :param bank: Memory bank to read from (`RESERVED`, `EPC`, `TID`, `USER`)
+        :param addr: Start byte offset
+        :param count: Count of bytes to read
+        :param progress: Called with bytes read so far and total bytes to read after each read chunk
+        :return: Bytes read from the specified memory bank
+        """
+        result = b""
+
+        if count == 0:
+            return result
+
+        if addr < 0:
+            raise InvalidParameterException("addr must be positive integer")
+
+        # Minimal range of 8-byte blocks containing requested data
+        blocks = list(range(addr // 8, (addr + count - 1) // 8 + 1))
+        done = 0
+        blocks_per_request = max(self.read_words // 4, 1)
+        while done < len(blocks):
+            for first, size in plan_reads(blocks[done:], blocks_per_request):
+                try:
+                    result += await self.__send_chunk(Gen2SecuredReadRequest(password=password, bank=bank,
+                                                                             addr=first * 4, count=size * 4))
+                except ErrorResponseException as exc:
+                    if blocks_per_request == 1 or exc.code == STATUS_NO_TAG:
+                        raise
+                    # Reader or tag may not support reads this large, retry remaining blocks with smaller ones
+                    blocks_per_request //= 2
+                    break
+                done += size
+                if progress is not None:
+                    progress(len(result), len(blocks) * 8)
+
+        # Smaller reads succeeded where larger ones failed, keep using them
+        if blocks_per_request < max(self.read_words // 4, 1):
+            self.read_words = blocks_per_request * 4
+
+        # Slice requested chunk from the possibly larger read chunk
+        return result[addr % 8:addr % 8 + count]
+
+    async def write_epc(self, password: int = 0, data: bytes = b"") -> None:
+        """
+        Write specified or random data to EPC bits 96-128 to make EPC unique
+        :param password: Access password
+        :param data: Data to write (bytes of length 4)
+        """
+        if len(data) == 0:
+            data = os.urandom(4)
+        if len(data) != 4:
+            raise InvalidParameterException("data must be exactly 4 bytes long if specified")
+        await self.send_request_return_response(Gen2SecuredWriteRequest(data[0:2], password=password,
+                                                                        bank=EPC, addr=6))
+        await self.send_request_return_response(Gen2SecuredWriteRequest(data[2:4], password=password,
+                                                                        bank=EPC, addr=7))
+
+    async def watch(self, password: int = 0, epc_words: int = 6,
+                    watcher: TagWatcher = None) -> AsyncIterator[TagEvent]:
+        """
+        Poll the field and yield deduplicated arrive and depart events of tags until closed. Deduplication
+        window and polling interval are set by `watcher`.
+        :param password: Access password
+        :param epc_words: Length of EPC in words
+        :param watcher: :class:`TagWatcher`, one with default settings if not specified
+        :return: async iterator of :class:`TagEvent`
+        """
+        watcher = watcher if watcher is not None else TagWatcher()
+        while True:
+            request = Gen2SecuredReadRequest(password=password, bank=EPC, addr=EPC_WORD_OFFSET, count=epc_words)
+            try:
+                epc = await self.send_request_return_response(request)
+            except ErrorResponseException as exc:
+                if exc.code != STATUS_NO_TAG:
+                    # Tag may still be in field, only tags not seen within the window depart
+                    events = watcher.expire(time.monotonic())
+                else:
+                    events = watcher.observe(None, time.monotonic())
+            else:
+                events = watcher.observe(bytes(epc), time.monotonic())
+
+            for event in events:
+                yield event
+            await asyncio.sleep(watcher.adapt(bool(events)))
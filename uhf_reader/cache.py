@@ -0,0 +1,226 @@
+import binascii
+import time
+
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from .constants import TID
+
+# Cached configuration values
+FIRMWARE_VERSION = 'fw_version'
+RADIO_POWER = 'rf_power'
+RADIO_FREQUENCY = 'rf_channel'
+
+
+class ReaderConfigCache:
+    """
+    Cache of reader configuration values which only change when set explicitly.
+    Values are kept until invalidated or, if `ttl` is set, for `ttl` seconds.
+    """
+    def __init__(self, ttl: float = None) -> None:
+        self.ttl = ttl
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Look up cached value
+        :param key: Value name
+        :return: tuple of a flag telling whether the value was found and the value itself
+        """
+        try:
+            value, expires = self.entries[key]
+        except KeyError:
+            self.misses += 1
+            return False, None
+
+        if expires is not None and time.monotonic() >= expires:
+            del self.entries[key]
+            self.misses += 1
+            return False, None
+
+        self.hits += 1
+        return True, value
+
+    def set(self, key: str, value: Any) -> None:
+        """
+        Store value
+        :param key: Value name
+        :param value: Value to store
+        """
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        self.entries[key] = (value, expires)
+
+    def invalidate(self, key: str = None) -> None:
+        """
+        Drop cached value
+        :param key: Value name, all values are dropped if not specified
+        """
+        if key is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(key, None)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters
+        :return: dict with `hits`, `misses` and number of cached `entries`
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.entries)}
+
+
+class TagBlockCache:
+    """
+    LRU cache of tag memory contents in 8-byte blocks, keyed by tag identity (EPC or TID), bank and block number.
+
+    Blocks of banks listed in `persistent_banks` are additionally stored in an on-disk :mod:`shelve` database
+    if `path` is given, which suits read-only data such as TID. The store keeps a list of block keys per tag,
+    so invalidating a tag does not scan the whole database.
+    """
+    block_size = 8
+    # Store entry marking databases which keep the per-tag key lists
+    INDEXED = "indexed"
+
+    def __init__(self, capacity: int = 4096, path: str = None, persistent_banks: Iterable[int] = (TID,)) -> None:
+        self.capacity = capacity
+        self.persistent_banks = frozenset(persistent_banks)
+        self.blocks = OrderedDict()
+        self.tags = defaultdict(set)
+        self.store = None
+        if path is not None:
+            import shelve
+            self.store = shelve.open(path)
+            self.__index_store()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def __store_key(tag: bytes, bank: int, block: int) -> str:
+        return "{}:{}:{}".format(binascii.hexlify(tag).decode(), bank, block)
+
+    @staticmethod
+    def __index_key(tag: bytes) -> str:
+        return binascii.hexlify(tag).decode()
+
+    def __index_store(self) -> None:
+        if self.INDEXED in self.store:
+            return
+        # Databases written before the key lists were kept are indexed once
+        index = defaultdict(list)
+        for key in self.store.keys():
+            index[key.partition(":")[0]].append(key)
+        for tag, keys in index.items():
+            self.store[tag] = keys
+        self.store[self.INDEXED] = True
+
+    def get(self, tag: bytes, bank: int, block: int) -> Optional[bytes]:
+        """
+        Look up cached block
+        :param tag: Tag identity
+        :param bank: Memory bank
+        :param block: Block number, i.e. byte offset divided by `block_size`
+        :return: Block contents or `None` if not cached
+        """
+        key = (bytes(tag), bank, block)
+        data = self.blocks.get(key)
+
+        if data is None and self.store is not None and bank in self.persistent_banks:
+            data = self.store.get(self.__store_key(*key))
+            if data is not None:
+                self.__remember(key, data)
+
+        if data is None:
+            self.misses += 1
+            return None
+
+        self.blocks.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, tag: bytes, bank: int, block: int, data: bytes) -> None:
+        """
+        Store block contents
+        :param tag: Tag identity
+        :param bank: Memory bank
+        :param block: Block number
+        :param data: Block contents, `block_size` bytes long
+        """
+        key = (bytes(tag), bank, block)
+        self.__remember(key, bytes(data))
+
+        if self.store is not None and bank in self.persistent_banks:
+            store_key = self.__store_key(*key)
+            if store_key not in self.store:
+                index_key = self.__index_key(key[0])
+                self.store[index_key] = self.store.get(index_key, []) + [store_key]
+            self.store[store_key] = bytes(data)
+
+    def __remember(self, key: Tuple[bytes, int, int], data: bytes) -> None:
+        self.blocks[key] = data
+        self.blocks.move_to_end(key)
+        self.tags[key[0]].add(key)
+
+        while len(self.blocks) > self.capacity:
+            evicted, _ = self.blocks.popitem(last=False)
+            self.__forget(evicted)
+
+    def __forget(self, key: Tuple[bytes, int, int]) -> None:
+        keys = self.tags.get(key[0])
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self.tags[key[0]]
+
+    def invalidate(self, tag: bytes, bank: int = None) -> None:
+        """
+        Drop cached blocks of the tag, both from memory and from the on-disk store
+        :param tag: Tag identity
+        :param bank: Memory bank, all banks are dropped if not specified
+        """
+        tag = bytes(tag)
+        for key in list(self.tags.get(tag, ())):
+            if bank is None or key[1] == bank:
+                self.blocks.pop(key, None)
+                self.__forget(key)
+
+        if self.store is None or (bank is not None and bank not in self.persistent_banks):
+            return
+
+        index_key = self.__index_key(tag)
+        keys = self.store.get(index_key)
+        if not keys:
+            return
+        prefix = "{}:{}:".format(index_key, bank) if bank is not None else index_key + ":"
+        kept = []
+        for key in keys:
+            if key.startswith(prefix):
+                self.store.pop(key, None)
+            else:
+                kept.append(key)
+        if kept:
+            self.store[index_key] = kept
+        else:
+            del self.store[index_key]
+
+    def clear(self) -> None:
+        """
+        Drop all blocks cached in memory
+        """
+        self.blocks.clear()
+        self.tags.clear()
+
+    def close(self) -> None:
+        """
+        Close the on-disk store
+        """
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get cache counters
+        :return: dict with `hits`, `misses` and number of cached `entries`
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self.blocks)}
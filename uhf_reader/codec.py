@@ -0,0 +1,45 @@
+import struct
+
+REQUEST_HEADER = 0x0a
+BROADCAST_ADDRESS = 0xff
+
+# Header, address and length byte preceding the command
+FRAME_HEAD = struct.Struct(">BBB")
+# Access password, memory bank and bank specific parameter (address or lock level)
+PASSWORD_BANK_PARAM = struct.Struct(">IBB")
+# Same as above followed by word count, used by secured read
+PASSWORD_BANK_PARAM_COUNT = struct.Struct(">IBBB")
+RADIO_POWER = struct.Struct(">BBBB")
+
+_frame_cache = {}
+
+
+def checksum(data) -> int:
+    """
+    Calculate packet checksum, the two's complement of the byte sum
+    :param data: Bytes-like object to calculate the checksum for
+    :return: Checksum value
+    """
+    return -sum(data) & 0xff
+
+
+def encode_frame(command: bytes, args: bytes = b"") -> bytes:
+    """
+    Encode request frame. Frames of commands without arguments are encoded once and cached.
+    :param command: Command byte
+    :param args: Command arguments
+    :return: Encoded frame
+    """
+    if not args:
+        frame = _frame_cache.get(command)
+        if frame is not None:
+            return frame
+
+    frame = FRAME_HEAD.pack(REQUEST_HEADER, BROADCAST_ADDRESS, len(command) + len(args) + 1) + command + args
+    # Checksum covers everything except the header byte
+    frame += bytes((-(sum(frame) - REQUEST_HEADER) & 0xff,))
+
+    if not args:
+        _frame_cache[command] = frame
+
+    return frame
@@ -28,3 +28,23 @@ UNLOCK = 0
 UNLOCK_FOREVER = 1
 SECURE_LOCK = 2
 LOCK_FOREVER = 3
+
+# Response status codes
+STATUS_NO_TAG = 0x04
+STATUS_TAG_READ_FAILED = 0x05
+STATUS_TAG_WRITE_FAILED = 0x06
+
+# Words read by a single secured read request by default (one 8-byte block)
+DEFAULT_READ_WORDS = 4
+
+# Request priorities, lower value is dispatched first
+PRIORITY_HIGH = 0
+PRIORITY_NORMAL = 1
+PRIORITY_LOW = 2
+
+# Tag watch events
+TAG_ARRIVED = 'arrive'
+TAG_DEPARTED = 'depart'
+
+# EPC bank word where the EPC starts, after CRC-16 and protocol control word
+EPC_WORD_OFFSET = 2
@@ -0,0 +1,156 @@
+from collections import deque
+from typing import Iterator, Optional
+
+from uhf_reader.exceptions import InvalidParameterException
+
+# Response frame layout: header (0x0B), address, length, status, payload..., checksum.
+# The length byte counts everything after itself, so the whole frame is length + 3 bytes.
+RESPONSE_HEADER = 0x0b
+MIN_FRAME_SIZE = 5
+MAX_FRAME_SIZE = 0xff + 3
+
+
+class UHFFrameDecoder:
+    """
+    Incremental decoder splitting a byte stream received from the reader into complete response frames.
+
+    Incoming data is accumulated in a preallocated buffer, either by :meth:`feed` or by receiving directly
+    into :meth:`writable` and calling :meth:`commit`. Only frames with a valid checksum are returned, garbage
+    preceding the 0x0B header and header bytes not starting a valid frame are discarded, so the decoder
+    resynchronizes on the next frame boundary after line noise or a partially lost frame. A stray header
+    announcing a frame longer than the data received is dropped as soon as a valid frame follows it.
+    Request frames share the layout and can be decoded by passing their 0x0A `header` and `checksum_start`
+    of 1, their checksum does not cover the header.
+
+    :meth:`feed` accepts chunks of any size: when the buffer fills up, complete frames are set aside until
+    drained and garbage is dropped, so only a partial frame ever remains in the buffer.
+    """
+    def __init__(self, buffer_size: int = 8192, header: int = RESPONSE_HEADER, checksum_start: int = 0) -> None:
+        if buffer_size < MAX_FRAME_SIZE:
+            raise InvalidParameterException("buffer_size must be at least {} bytes".format(MAX_FRAME_SIZE))
+
+        self.header = header
+        self.checksum_start = checksum_start
+        self.buffer = bytearray(buffer_size)
+        self.view = memoryview(self.buffer)
+        self.start = 0
+        self.end = 0
+        self.ready = deque()
+
+    def __len__(self) -> int:
+        return self.end - self.start + sum(len(frame) for frame in self.ready)
+
+    def reset(self) -> None:
+        """
+        Discard all buffered data
+        """
+        self.start = 0
+        self.end = 0
+        self.ready.clear()
+
+    def writable(self) -> memoryview:
+        """
+        Get free part of the buffer suitable for `socket.recv_into`
+        :return: Writable memoryview, call :meth:`commit` with the number of bytes actually written
+        """
+        if self.start == self.end:
+            self.start = self.end = 0
+        elif self.start and len(self.buffer) - self.end < MAX_FRAME_SIZE:
+            # Move the incomplete tail to the beginning of the buffer
+            length = self.end - self.start
+            self.view[:length] = self.view[self.start:self.end]
+            self.start, self.end = 0, length
+
+        return self.view[self.end:]
+
+    def commit(self, count: int) -> None:
+        """
+        Account for bytes written into the memoryview returned by :meth:`writable`
+        :param count: Number of bytes written
+        """
+        self.end += count
+
+    def feed(self, data: bytes) -> None:
+        """
+        Append received data to the buffer. Complete frames must be drained with :meth:`frames`
+        or :meth:`get_frame` afterwards.
+        :param data: Bytes received from the transport
+        """
+        offset = 0
+        while offset < len(data):
+            target = self.writable()
+            if len(target) < MAX_FRAME_SIZE:
+                # Set complete frames aside and drop noise, leaving at most a partial frame to move
+                frame = self.__parse()
+                while frame is not None:
+                    self.ready.append(frame)
+                    frame = self.__parse()
+                target = self.writable()
+            count = min(len(target), len(data) - offset)
+            target[:count] = data[offset:offset + count]
+            self.commit(count)
+            offset += count
+
+    def get_frame(self) -> Optional[bytes]:
+        """
+        Extract the next complete frame from the buffer
+        :return: Frame bytes or `None` if more data is needed
+        """
+        if self.ready:
+            return self.ready.popleft()
+        return self.__parse()
+
+    def __parse(self) -> Optional[bytes]:
+        while self.start < self.end:
+            if self.buffer[self.start] != self.header:
+                header = self.buffer.find(self.header, self.start, self.end)
+                self.start = self.end if header < 0 else header
+                continue
+
+            if self.end - self.start < 3:
+                return None
+
+            size = self.buffer[self.start + 2] + 3
+            if size < MIN_FRAME_SIZE:
+                # Not a real header, skip it and look for the next one
+                self.start += 1
+                continue
+
+            if self.end - self.start < size:
+                if self.__frame_follows():
+                    # Length of a stray header byte, the frame being waited for does not exist
+                    self.start += 1
+                    continue
+                return None
+
+            if not self.__checksum_valid(self.start, size):
+                self.start += 1
+                continue
+
+            frame = bytes(self.view[self.start:self.start + size])
+            self.start += size
+            return frame
+
+        return None
+
+    def __checksum_valid(self, offset: int, size: int) -> bool:
+        # Checksum is the two's complement of the sum of the bytes it covers
+        return sum(self.view[offset + self.checksum_start:offset + size]) & 0xff == 0
+
+    def __frame_follows(self) -> bool:
+        offset = self.buffer.find(self.header, self.start + 1, self.end)
+        while 0 <= offset <= self.end - MIN_FRAME_SIZE:
+            size = self.buffer[offset + 2] + 3
+            if size >= MIN_FRAME_SIZE and offset + size <= self.end and self.__checksum_valid(offset, size):
+                return True
+            offset = self.buffer.find(self.header, offset + 1, self.end)
+        return False
+
+    def frames(self) -> Iterator[bytes]:
+        """
+        Iterate over all complete frames currently in the buffer
+        """
+        frame = self.get_frame()
+        while frame is not None:
+            yield frame
+            frame = self.get_frame()
@@ -0,0 +1,301 @@
+import binascii
+import csv
+import json
+import logging
+import os
+import queue
+import threading
+import time
+
+from collections import namedtuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple, Union
+
+from .uhf_reader import UHFReader
+from .request import UHFRequest, Gen2SecuredWriteRequest, Gen2SecuredLockRequest
+from .planner import split_words
+from .exceptions import InvalidParameterException
+from .constants import RESERVED, EPC, TID, USER, UNLOCK, UNLOCK_FOREVER, SECURE_LOCK, LOCK_FOREVER
+
+# Tag to program: `epc` is the 4 byte EPC suffix (bits 96-128) or `None`, `user` is written to USER bank
+# from offset 0 or `None`, `locks` is a sequence of (bank, level) tuples applied after all writes succeeded
+EncodingJob = namedtuple('EncodingJob', ['job_id', 'epc', 'user', 'locks', 'password'])
+EncodingJob.__new__.__defaults__ = (None, None, (), 0)
+
+BANKS = {'RESERVED': RESERVED, 'EPC': EPC, 'TID': TID, 'USER': USER}
+LOCK_LEVELS = {'UNLOCK': UNLOCK, 'UNLOCK_FOREVER': UNLOCK_FOREVER, 'SECURE_LOCK': SECURE_LOCK,
+               'LOCK_FOREVER': LOCK_FOREVER}
+
+
+def parse_lock_plan(plan: str) -> Tuple[Tuple[int, int], ...]:
+    """
+    Parse lock plan written as `BANK=LEVEL` pairs separated by semicolons, e.g. `USER=LOCK_FOREVER;EPC=SECURE_LOCK`
+    :param plan: Lock plan, may be empty
+    :return: tuple of (bank, level) tuples
+    """
+    locks = []
+    for item in plan.split(';'):
+        item = item.strip()
+        if not item:
+            continue
+        bank, _, level = item.partition('=')
+        try:
+            locks.append((BANKS[bank.strip().upper()], LOCK_LEVELS[level.strip().upper()]))
+        except KeyError:
+            raise InvalidParameterException("invalid lock plan item {!r}".format(item))
+    return tuple(locks)
+
+
+def read_jobs_csv(source: Union[str, TextIO]) -> Iterator[EncodingJob]:
+    """
+    Read encoding jobs from CSV with header row naming the columns `job_id`, `epc`, `user`, `locks`
+    and `password`. Only `job_id` is required, `epc` and `user` are hex strings, `locks` is a lock plan
+    accepted by :func:`parse_lock_plan` and `password` is a hex access password.
+    :param source: Path or open text file
+    :return: iterator of :class:`EncodingJob`, rows are read lazily
+    """
+    if isinstance(source, str):
+        with open(source, newline='') as file:
+            yield from read_jobs_csv(file)
+        return
+
+    for row in csv.DictReader(source):
+        epc = row.get('epc') or None
+        user = row.get('user') or None
+        yield EncodingJob(job_id=row['job_id'],
+                          epc=binascii.unhexlify(epc) if epc else None,
+                          user=binascii.unhexlify(user) if user else None,
+                          locks=parse_lock_plan(row.get('locks') or ""),
+                          password=int(row.get('password') or "0", 16))
+
+
+class EncodingJournal:
+    """
+    Append-only journal of finished jobs, one JSON object per line. Jobs recorded as encoded are skipped
+    when the journal is opened again, so an interrupted run resumes where it left off. A line torn by
+    a crash is ignored, the job it belonged to is encoded again.
+    With `sync` every record is fsynced, surviving power loss and not only a crash of the process.
+    """
+    def __init__(self, path: str, sync: bool = True) -> None:
+        self.path = path
+        self.sync = sync
+        self.completed = set()
+        self.lock = threading.Lock()
+
+        if os.path.exists(path):
+            with open(path) as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get('status') == 'encoded':
+                        self.completed.add(record['job_id'])
+
+        self.file = open(path, 'a')
+
+    def __enter__(self) -> 'EncodingJournal':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def __contains__(self, job_id: str) -> bool:
+        return job_id in self.completed
+
+    def record(self, job_id: str, reader: str, error: Exception = None) -> None:
+        """
+        Append job outcome
+        :param job_id: Job identifier
+        :param reader: Name of the reader which ran the job
+        :param error: Exception the job failed with, `None` if the tag was encoded
+        """
+        record = {'job_id': job_id, 'reader': reader, 'time': time.time(),
+                  'status': 'encoded' if error is None else 'failed'}
+        if error is not None:
+            record['error'] = repr(error)
+
+        with self.lock:
+            self.file.write(json.dumps(record) + "\n")
+            self.file.flush()
+            if self.sync:
+                os.fsync(self.file.fileno())
+            if error is None:
+                self.completed.add(job_id)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class EncodingStats:
+    """
+    Counters of a :meth:`BulkEncoder.run`
+    """
+    def __init__(self) -> None:
+        self.encoded = 0
+        self.failed = 0
+        self.skipped = 0
+        self.started = time.monotonic()
+        self.finished = None
+
+    @property
+    def elapsed(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def tags_per_minute(self) -> float:
+        elapsed = self.elapsed
+        return self.encoded * 60.0 / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        return "EncodingStats(encoded={}, failed={}, skipped={}, tags_per_minute={:.1f})".format(
+            self.encoded, self.failed, self.skipped, self.tags_per_minute)
+
+
+class BulkEncoder:
+    """
+    Programs a stream of tags described by :class:`EncodingJob` on one or more synchronous readers.
+
+    Every reader is driven by its own thread pulling jobs from a shared bounded queue, so jobs are
+    consumed lazily and a slow reader does not hold up the others. All writes of a job are sent as one
+    burst through :meth:`UHFReader.transfer` with up to `window` requests in flight, locks follow in
+    a second burst once the writes succeeded, so a tag is never locked with partially written data.
+    `window` defaults to the `pipeline_window` of each reader, which sends one request at a time unless
+    configured otherwise.
+
+    Jobs already recorded as encoded in the `journal` are skipped, `on_result` is called from reader
+    threads with the job, reader name and exception or `None` once each job is finished. Errors raised by
+    `on_result` are logged, a job which can not be recorded in the journal stops the run, :meth:`run` then
+    raises the error once the jobs in progress are finished.
+    """
+    def __init__(self, readers: Dict[str, UHFReader], journal: EncodingJournal = None,
+                 on_result: Callable[[EncodingJob, str, Optional[Exception]], None] = None,
+                 window: int = None) -> None:
+        if not readers:
+            raise InvalidParameterException("at least one reader is required")
+
+        self.readers = readers
+        self.journal = journal
+        self.on_result = on_result
+        self.window = window
+        self.stats = None
+        self.failure = None
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def build_writes(job: EncodingJob) -> List[UHFRequest]:
+        """
+        Build write requests for the job
+        :param job: :class:`EncodingJob`
+        :return: list of :class:`Gen2SecuredWriteRequest`
+        """
+        requests = []
+        if job.epc is not None:
+            if len(job.epc) != 4:
+                raise InvalidParameterException("epc must be exactly 4 bytes long")
+            requests.extend(Gen2SecuredWriteRequest(chunk, password=job.password, bank=EPC, addr=word)
+                            for word, chunk in split_words(job.epc, 12))
+        if job.user:
+            requests.extend(Gen2SecuredWriteRequest(chunk, password=job.password, bank=USER, addr=word)
+                            for word, chunk in split_words(job.user))
+        return requests
+
+    @staticmethod
+    def build_locks(job: EncodingJob) -> List[UHFRequest]:
+        """
+        Build lock requests for the job
+        :param job: :class:`EncodingJob`
+        :return: list of :class:`Gen2SecuredLockRequest`
+        """
+        return [Gen2SecuredLockRequest(password=job.password, bank=bank, level=level) for bank, level in job.locks]
+
+    def encode(self, reader: UHFReader, job: EncodingJob) -> None:
+        """
+        Program single tag
+        :param reader: :class:`UHFReader` with the tag in field
+        :param job: :class:`EncodingJob`
+        """
+        writes = self.build_writes(job)
+        if writes:
+            reader.transfer(writes, window=self.window)
+        locks = self.build_locks(job)
+        if locks:
+            reader.transfer(locks, window=self.window)
+
+    def __work(self, name: str, reader: UHFReader, jobs: queue.Queue) -> None:
+        while self.failure is None:
+            job = jobs.get()
+            if job is None:
+                return
+
+            try:
+                self.encode(reader, job)
+                error = None
+            except Exception as exc:
+                error = exc
+
+            if self.journal is not None:
+                try:
+                    self.journal.record(job.job_id, name, error)
+                except Exception as exc:
+                    # Jobs encoded without a record would be encoded again on resume
+                    self.failure = exc
+                    return
+
+            with self.lock:
+                if error is None:
+                    self.stats.encoded += 1
+                else:
+                    self.stats.failed += 1
+
+            if self.on_result is not None:
+                try:
+                    self.on_result(job, name, error)
+                except Exception:
+                    self.logger.exception("Result callback failed for job %s", job.job_id)
+
+    @staticmethod
+    def __put(pending: queue.Queue, item: Optional[EncodingJob], workers: List[threading.Thread]) -> bool:
+        # Workers may stop on failure, a bounded queue nobody reads from must not block forever
+        while any(worker.is_alive() for worker in workers):
+            try:
+                pending.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def run(self, jobs: Iterable[EncodingJob]) -> EncodingStats:
+        """
+        Encode all jobs, failed jobs are recorded and skipped
+        :param jobs: Iterable of :class:`EncodingJob`, e.g. from :func:`read_jobs_csv`
+        :return: :class:`EncodingStats`
+        :raises: Error of the journal if a job could not be recorded
+        """
+        self.stats = EncodingStats()
+        self.failure = None
+
+        # Room for one job waiting per reader keeps every reader busy without reading all jobs ahead
+        pending = queue.Queue(maxsize=len(self.readers))
+        workers = [threading.Thread(target=self.__work, args=(name, reader, pending), daemon=True)
+                   for name, reader in self.readers.items()]
+        for worker in workers:
+            worker.start()
+
+        try:
+            for job in jobs:
+                if self.journal is not None and job.job_id in self.journal:
+                    self.stats.skipped += 1
+                    continue
+                if self.failure is not None or not self.__put(pending, job, workers):
+                    break
+        finally:
+            for _ in workers:
+                self.__put(pending, None, workers)
+            for worker in workers:
+                worker.join()
+            self.stats.finished = time.monotonic()
+
+        if self.failure is not None:
+            raise self.failure
+        return self.stats
@@ -36,6 +36,17 @@ class NetworkException(Exception):
     pass
 
 
+class ReceiveTimeoutException(NetworkException):
+    pass
+
+
+class VerificationException(Exception):
+    def __init__(self, expected: bytes, actual: bytes):
+        self.expected = expected
+        self.actual = actual
+        super().__init__("read back data does not match written data")
+
+
 class RequestException(Exception):
     def __init__(self, request):
         self.request = request
@@ -43,3 +54,11 @@ class RequestException(Exception):
 
 class RequestTimeoutException(RequestException):
     pass
+
+
+class RequestExpiredException(RequestException):
+    pass
+
+
+class QueueFullException(RequestException):
+    pass
@@ -1,24 +1,100 @@
 import logging
-import queue
 
 from collections import defaultdict
 from twisted.internet.protocol import ReconnectingClientFactory
 
+from uhf_reader.cache import ReaderConfigCache
+from uhf_reader.request_queue import UHFRequestQueue
+from uhf_reader.reader_group import UHFReaderGroup
+
 
 class UHFReaderClientFactory(ReconnectingClientFactory):
-    def __init__(self, timeout=5, **kwargs):
+    # Response latency assumed for readers which did not answer yet and smoothing of observed latencies
+    initial_latency = 0.05
+    latency_smoothing = 0.2
+
+    def __init__(self, timeout=5, cache_ttl=None, metrics=None, max_timeouts=3, stale_timeout=None,
+                 high_water=None, low_water=None, max_held=None, **kwargs):
         super().__init__(**kwargs)
         self.timeout = timeout
-        self.queues = defaultdict(queue.Queue)
+        # Consecutive request timeouts after which the connection is considered broken and reestablished
+        self.max_timeouts = max_timeouts
+        # How long to wait for late response to a timed out request before sending the next one
+        self.stale_timeout = stale_timeout if stale_timeout is not None else timeout
+        self.cache_ttl = cache_ttl
+        self.metrics = metrics
+        # Bound of each reader queue, producers are held back or refused once it is reached
+        self.high_water = high_water
+        self.low_water = low_water
+        self.max_held = max_held
+        self.queues = defaultdict(self.createQueue)
+        self.config_caches = {}
+        self.groups = {}
+        self.protocols = {}
+        self.latencies = {}
         self.logger = logging.getLogger(__name__)
 
         # Override default factor & delay
         self.factor = 1.5
         self.maxDelay = 5.0
 
+    def createQueue(self):
+        return UHFRequestQueue(high_water=self.high_water, low_water=self.low_water, max_held=self.max_held)
+
     def getQueue(self, peer_id):
         return self.queues[peer_id]
 
+    def getConfigCache(self, peer_id):
+        if peer_id not in self.config_caches:
+            self.config_caches[peer_id] = ReaderConfigCache(ttl=self.cache_ttl)
+        return self.config_caches[peer_id]
+
+    def getGroup(self, name, peers=()):
+        """
+        Get group of readers sharing the work submitted to it, creating it on first use
+        :param name: Group name
+        :param peers: Reader `host:port` identifiers to add to the group
+        :return: :class:`UHFReaderGroup`
+        """
+        if name not in self.groups:
+            self.groups[name] = UHFReaderGroup(self, name)
+        group = self.groups[name]
+        for peer_id in peers:
+            group.add(peer_id)
+        return group
+
+    def getLatency(self, peer_id):
+        return self.latencies.get(peer_id, self.initial_latency)
+
+    def readerConnected(self, protocol):
+        self.protocols[protocol.peer_id] = protocol
+        for group in self.groups.values():
+            if protocol.peer_id in group.peers:
+                group.dispatch()
+
+    def readerDisconnected(self, protocol, request):
+        """
+        Forget disconnected reader, moving work assigned to it by groups to other members
+        :return: `True` if the in-flight `request` was requeued by a group
+        """
+        if self.protocols.get(protocol.peer_id) is protocol:
+            del self.protocols[protocol.peer_id]
+
+        requeued = False
+        for group in self.groups.values():
+            if protocol.peer_id in group.peers:
+                requeued = group.reader_lost(protocol.peer_id, request) or requeued
+        return requeued
+
+    def requestDone(self, protocol, request, latency=None):
+        if latency is not None:
+            previous = self.latencies.get(protocol.peer_id, latency)
+            self.latencies[protocol.peer_id] = previous + (latency - previous) * self.latency_smoothing
+
+        for group in self.groups.values():
+            if protocol.peer_id in group.peers:
+                group.request_done(protocol.peer_id, request)
+
     def startedConnecting(self, connector):
         self.logger.info("Started to connect to UHF reader")
 
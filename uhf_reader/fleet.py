@@ -0,0 +1,135 @@
+import threading
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterable, Union
+
+from .uhf_reader import UHFReader
+from .exceptions import InvalidParameterException
+from .constants import RADIO_FREQUENCY_EUROPE, USER, EPC, UNLOCK
+
+FleetResult = namedtuple('FleetResult', ['value', 'error'])
+
+
+class ReaderFleet:
+    """
+    Runs operations on many synchronous :class:`UHFReader` instances concurrently over a bounded thread pool.
+
+    Each operation returns a dict mapping reader name to :class:`FleetResult` holding either the value
+    returned by the reader or the exception it raised, so one failing reader does not affect the others.
+    """
+    max_workers = 16
+
+    def __init__(self, readers: Dict[str, UHFReader] = None, **kwargs) -> None:
+        self.max_workers = kwargs.get('max_workers', self.max_workers)
+        self.readers = {}
+        self.locks = {}
+        self.executor = ThreadPoolExecutor(max_workers=self.max_workers)
+
+        for name, reader in (readers or {}).items():
+            self.add(name, reader)
+
+    def __enter__(self) -> 'ReaderFleet':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def add(self, name: str, reader: UHFReader) -> None:
+        """
+        Add reader to the fleet
+        :param name: Unique reader name, e.g. `host:port`
+        :param reader: :class:`UHFReader` instance
+        """
+        if name in self.readers:
+            raise InvalidParameterException("reader {} already added".format(name))
+        self.readers[name] = reader
+        self.locks[name] = threading.Lock()
+
+    def remove(self, name: str) -> UHFReader:
+        """
+        Remove reader from the fleet
+        :param name: Reader name
+        :return: Removed :class:`UHFReader` instance
+        """
+        del self.locks[name]
+        return self.readers.pop(name)
+
+    def close(self) -> None:
+        """
+        Shut down the thread pool, waiting for running operations to complete
+        """
+        self.executor.shutdown(wait=True)
+
+    def run(self, method: Union[str, Callable[[UHFReader], Any]], *args,
+            names: Iterable[str] = None, **kwargs) -> Dict[str, FleetResult]:
+        """
+        Run operation on selected readers concurrently
+        :param method: :class:`UHFReader` method name or callable receiving the reader as first argument
+        :param args: Positional arguments for the operation
+        :param names: Names of readers to run the operation on, defaults to all readers
+        :param kwargs: Keyword arguments for the operation
+        :return: dict mapping reader name to :class:`FleetResult`
+        """
+        if names is None:
+            names = list(self.readers)
+
+        futures = {}
+        for name in names:
+            if name not in self.readers:
+                raise InvalidParameterException("unknown reader {}".format(name))
+            futures[name] = self.executor.submit(self.__call, name, method, args, kwargs)
+
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = FleetResult(future.result(), None)
+            except Exception as exc:
+                results[name] = FleetResult(None, exc)
+
+        return results
+
+    def __call(self, name: str, method: Union[str, Callable[[UHFReader], Any]], args, kwargs) -> Any:
+        reader = self.readers[name]
+        with self.locks[name]:
+            if callable(method):
+                return method(reader, *args, **kwargs)
+            return getattr(reader, method)(*args, **kwargs)
+
+    def connect(self, names: Iterable[str] = None) -> Dict[str, FleetResult]:
+        return self.run('connect', names=names)
+
+    def disconnect(self, names: Iterable[str] = None) -> Dict[str, FleetResult]:
+        return self.run('disconnect', names=names)
+
+    def get_fw_version(self, names: Iterable[str] = None) -> Dict[str, FleetResult]:
+        return self.run('get_fw_version', names=names)
+
+    def reset_reader(self, names: Iterable[str] = None) -> Dict[str, FleetResult]:
+        return self.run('reset_reader', names=names)
+
+    def set_rf_power(self, power1: int = 20, power2: int = 2, power3: int = 32, power4: int = 0,
+                     names: Iterable[str] = None) -> Dict[str, FleetResult]:
+        return self.run('set_rf_power', power1=power1, power2=power2, power3=power3, power4=power4, names=names)
+
+    def get_rf_power(self, names: Iterable[str] = None) -> Dict[str, FleetResult]:
+        return self.run('get_rf_power', names=names)
+
+    def set_rf_channel(self, region: int = RADIO_FREQUENCY_EUROPE,
+                       names: Iterable[str] = None) -> Dict[str, FleetResult]:
+        return self.run('set_rf_channel', region=region, names=names)
+
+    def get_rf_channel(self, names: Iterable[str] = None) -> Dict[str, FleetResult]:
+        return self.run('get_rf_channel', names=names)
+
+    def gen2_sec_lock(self, password: int = 0, bank: int = USER, level: int = UNLOCK,
+                      names: Iterable[str] = None) -> Dict[str, FleetResult]:
+        return self.run('gen2_sec_lock', password=password, bank=bank, level=level, names=names)
+
+    def gen2_sec_write(self, data: bytes, password: int = 0, bank: int = USER,
+                       names: Iterable[str] = None) -> Dict[str, FleetResult]:
+        return self.run('gen2_sec_write', data, password=password, bank=bank, names=names)
+
+    def gen2_sec_read(self, password: int = 0, bank: int = EPC, addr: int = 0, count: int = 16,
+                      names: Iterable[str] = None) -> Dict[str, FleetResult]:
+        return self.run('gen2_sec_read', password=password, bank=bank, addr=addr, count=count, names=names)
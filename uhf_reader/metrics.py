@@ -0,0 +1,159 @@
+import threading
+import time
+
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Iterable, Tuple
+
+from uhf_reader.exceptions import ErrorResponseException, InvalidChecksumException, ReceiveTimeoutException, \
+    RequestTimeoutException
+
+# Latency histogram bucket bounds in seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+class MetricsSink:
+    """
+    Destination of collected metrics. Implementations must be thread-safe.
+    """
+    def observe(self, name: str, labels: Dict[str, str], value: float) -> None:
+        raise NotImplementedError
+
+    def increment(self, name: str, labels: Dict[str, str], amount: int = 1) -> None:
+        raise NotImplementedError
+
+    def set_gauge(self, name: str, labels: Dict[str, str], value: float) -> None:
+        raise NotImplementedError
+
+
+class PrometheusSink(MetricsSink):
+    """
+    In-memory sink aggregating histograms, counters and gauges, exposed in Prometheus text format
+    """
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.histograms = defaultdict(dict)
+        self.counters = defaultdict(dict)
+        self.gauges = defaultdict(dict)
+        self.lock = threading.Lock()
+
+    @staticmethod
+    def __key(labels: Dict[str, str]) -> Labels:
+        return tuple(sorted(labels.items()))
+
+    def observe(self, name: str, labels: Dict[str, str], value: float) -> None:
+        key = self.__key(labels)
+        with self.lock:
+            series = self.histograms[name].get(key)
+            if series is None:
+                # Per-bucket counts, the last one for values above all bounds, followed by sum
+                series = self.histograms[name][key] = [0] * (len(self.buckets) + 1) + [0.0]
+            series[bisect_left(self.buckets, value)] += 1
+            series[-1] += value
+
+    def increment(self, name: str, labels: Dict[str, str], amount: int = 1) -> None:
+        key = self.__key(labels)
+        with self.lock:
+            self.counters[name][key] = self.counters[name].get(key, 0) + amount
+
+    def set_gauge(self, name: str, labels: Dict[str, str], value: float) -> None:
+        with self.lock:
+            self.gauges[name][self.__key(labels)] = value
+
+    @staticmethod
+    def __format_labels(labels: Labels, extra: Labels = ()) -> str:
+        labels = labels + extra
+        if not labels:
+            return ""
+        return "{" + ",".join('{}="{}"'.format(name, value) for name, value in labels) + "}"
+
+    def exposition(self) -> str:
+        """
+        Render collected metrics in Prometheus text exposition format
+        """
+        lines = []
+        with self.lock:
+            for name, series in sorted(self.histograms.items()):
+                lines.append("# TYPE {} histogram".format(name))
+                for labels, values in sorted(series.items()):
+                    cumulative = 0
+                    for bound, count in zip(self.buckets + ("+Inf",), values):
+                        cumulative += count
+                        lines.append("{}_bucket{} {}".format(
+                            name, self.__format_labels(labels, (("le", str(bound)),)), cumulative))
+                    lines.append("{}_sum{} {}".format(name, self.__format_labels(labels), values[-1]))
+                    lines.append("{}_count{} {}".format(name, self.__format_labels(labels), cumulative))
+
+            for kind, metrics in (("counter", self.counters), ("gauge", self.gauges)):
+                for name, series in sorted(metrics.items()):
+                    lines.append("# TYPE {} {}".format(name, kind))
+                    for labels, value in sorted(series.items()):
+                        lines.append("{}{} {}".format(name, self.__format_labels(labels), value))
+
+        return "\n".join(lines) + "\n"
+
+
+class UHFMetrics:
+    """
+    Request instrumentation used by the clients, forwarding measurements to the sinks.
+
+    Latency of each request is split into queue wait (asynchronous clients only), wire time from sending
+    the request to receiving its complete response, and response parse time, keyed by command byte.
+    Clients skip all instrumentation when no :class:`UHFMetrics` instance is configured.
+    """
+    def __init__(self, *sinks: MetricsSink) -> None:
+        self.sinks = list(sinks) if sinks else [PrometheusSink()]
+
+    @staticmethod
+    def __command(request) -> Dict[str, str]:
+        return {'command': "0x{:02x}".format(request.data[3])}
+
+    def __observe(self, name: str, labels: Dict[str, str], value: float) -> None:
+        for sink in self.sinks:
+            sink.observe(name, labels, value)
+
+    def __increment(self, name: str, labels: Dict[str, str]) -> None:
+        for sink in self.sinks:
+            sink.increment(name, labels)
+
+    def __set_gauge(self, name: str, labels: Dict[str, str], value: float) -> None:
+        for sink in self.sinks:
+            sink.set_gauge(name, labels, value)
+
+    def request_queued(self, request) -> None:
+        request.queued_at = time.perf_counter()
+
+    def request_sent(self, request) -> None:
+        request.sent_at = time.perf_counter()
+        if request.queued_at is not None:
+            self.__observe('uhf_request_queue_seconds', self.__command(request), request.sent_at - request.queued_at)
+
+    def response_received(self, request) -> None:
+        request.received_at = time.perf_counter()
+        if request.sent_at is not None:
+            self.__observe('uhf_request_wire_seconds', self.__command(request), request.received_at - request.sent_at)
+
+    def response_parsed(self, request) -> None:
+        if request.received_at is not None:
+            self.__observe('uhf_request_parse_seconds', self.__command(request),
+                           time.perf_counter() - request.received_at)
+
+    def request_failed(self, request, exc: Exception) -> None:
+        labels = self.__command(request)
+        if isinstance(exc, ErrorResponseException):
+            labels['code'] = "0x{:02x}".format(exc.code)
+            self.__increment('uhf_error_responses_total', labels)
+        elif isinstance(exc, InvalidChecksumException):
+            self.__increment('uhf_checksum_failures_total', labels)
+        elif isinstance(exc, (RequestTimeoutException, ReceiveTimeoutException)):
+            self.__increment('uhf_request_timeouts_total', labels)
+        else:
+            self.__increment('uhf_request_failures_total', labels)
+
+    def set_in_flight(self, peer: str, count: int) -> None:
+        self.__set_gauge('uhf_requests_in_flight', {'peer': peer}, count)
+
+    def set_queue_depth(self, peer: str, depth: int) -> None:
+        self.__set_gauge('uhf_queue_depth', {'peer': peer}, depth)
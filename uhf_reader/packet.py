@@ -1,4 +1,9 @@
+from uhf_reader.codec import checksum
+
+
 class UHFPacket:
+    __slots__ = ('data',)
+
     def __init__(self, data: bytes) -> None:
         self.data = data
 
@@ -10,16 +15,4 @@ class UHFPacket:
         :rtype: int
         :return: Checksum value
         """
-        checksum = 0
-
-        for x in packet:
-            checksum = checksum + x
-            if checksum > 255:
-                checksum = checksum.to_bytes(2, byteorder='big')[1]
-
-        checksum = ((~checksum) + 1) & 0xff
-
-        if checksum > 255:
-            checksum = checksum.to_bytes(2, byteorder='big')[1]
-
-        return checksum
+        return checksum(packet)
@@ -0,0 +1,45 @@
+from typing import Iterable, List, Tuple
+
+from uhf_reader.exceptions import InvalidParameterException
+
+
+def split_words(data: bytes, addr: int = 0) -> List[Tuple[int, bytes]]:
+    """
+    Split data into 2-byte words addressed for :class:`Gen2SecuredWriteRequest`
+    :param data: Data to write, padded with zero byte if its length is odd
+    :param addr: Start byte offset, must be even
+    :return: list of (word address, word) tuples
+    """
+    if addr < 0 or addr % 2 != 0:
+        raise InvalidParameterException("addr must be even positive integer")
+    if len(data) % 2 != 0:
+        data += b"\x00"
+    return [((addr + i) // 2, data[i:i + 2]) for i in range(0, len(data), 2)]
+
+
+def plan_write(current: bytes, data: bytes, addr: int = 0) -> List[Tuple[int, bytes]]:
+    """
+    Plan writes turning current memory contents into desired ones, skipping words which are already equal
+    :param current: Current contents of the memory starting at byte offset `addr`
+    :param data: Desired contents starting at byte offset `addr`, padded with zero byte if its length is odd
+    :param addr: Start byte offset, must be even
+    :return: list of (word address, word) tuples to write
+    """
+    return [(word, chunk) for word, chunk in split_words(data, addr)
+            if current[word * 2 - addr:word * 2 - addr + 2] != chunk]
+
+
+def plan_reads(blocks: Iterable[int], blocks_per_request: int) -> List[Tuple[int, int]]:
+    """
+    Group 8-byte blocks into as few reads as possible, each spanning contiguous blocks
+    :param blocks: Ascending block numbers to read
+    :param blocks_per_request: Maximum number of blocks read by one request
+    :return: list of (first block, number of blocks) tuples
+    """
+    reads = []
+    for block in blocks:
+        if reads and reads[-1][0] + reads[-1][1] == block and reads[-1][1] < blocks_per_request:
+            reads[-1] = (reads[-1][0], reads[-1][1] + 1)
+        else:
+            reads.append((block, 1))
+    return reads
@@ -1,61 +1,142 @@
-import queue
+import time
 
-from twisted.internet import reactor
+from twisted.internet import defer
 from twisted.internet.protocol import Protocol
 from twisted.protocols.policies import TimeoutMixin
 
-from uhf_reader.exceptions import RequestTimeoutException
+from uhf_reader.decoder import UHFFrameDecoder
+from uhf_reader.exceptions import RequestTimeoutException, NetworkException
 
 
 class UHFReaderProtocolBase(Protocol, TimeoutMixin):
     request = None
     peer_id = None
     queue = None
+    decoder = None
+    waiting = None
+    sent_at = None
+    # Waiting for the late response to a timed out request, nothing is sent meanwhile
+    stale = False
+    consecutive_timeouts = 0
 
     def dataReceived(self, data):
+        self.decoder.feed(data)
+        for frame in self.decoder.frames():
+            self.frameReceived(frame)
+
+    def frameReceived(self, frame):
+        if self.stale:
+            self.factory.logger.warning("Discarding late response to timed out request: %s", frame)
+            self.stale = False
+            self.setTimeout(None)
+            self.checkQueue()
+            return
+
+        request, self.request = self.request, None
+        if request is None:
+            self.factory.logger.warning("Discarding unsolicited response: %s", frame)
+            return
+
+        self.consecutive_timeouts = 0
+
+        metrics = self.factory.metrics
         try:
-            if self.request:
-                response = self.request.parse_response(data)
-                self.factory.logger.debug("Received response: %s", response.value())
+            if metrics is not None:
+                metrics.response_received(request)
+                metrics.set_in_flight(self.peer_id, 0)
+            response = request.parse_response(frame)
+            if metrics is not None:
+                metrics.response_parsed(request)
+            self.factory.logger.debug("Received response: %s", response.value())
 
-                if self.request.deferred:
-                    self.request.deferred.callback((self.request, response))
+            if request.deferred:
+                request.deferred.callback((request, response))
         except Exception as exc:
-            if self.request and self.request.deferred:
-                self.request.deferred.errback(exc)
+            if metrics is not None:
+                metrics.request_failed(request, exc)
+            if request.deferred:
+                request.deferred.errback(exc)
         finally:
             self.setTimeout(None)
 
+        self.factory.requestDone(self, request, time.monotonic() - self.sent_at)
         self.checkQueue()
 
     def connectionMade(self):
         peer = self.transport.getPeer()
         self.peer_id = "{}:{}".format(peer.host, peer.port)
+        self.decoder = UHFFrameDecoder()
         self.queue = self.factory.getQueue(self.peer_id)
+        # Reader might have been reset or reconfigured while disconnected
+        self.factory.getConfigCache(self.peer_id).invalidate()
+        self.factory.readerConnected(self)
         self.checkQueue()
 
+    def connectionLost(self, reason):
+        self.setTimeout(None)
+        if self.waiting is not None:
+            self.waiting.cancel()
+
+        # Request in flight is either moved to another reader of its group or failed
+        request, self.request = self.request, None
+        if not self.factory.readerDisconnected(self, request) and request is not None \
+                and request.deferred and not request.deferred.called:
+            request.deferred.errback(NetworkException("connection lost: " + str(reason.value)))
+
+        super().connectionLost(reason)
+
     def timeoutConnection(self):
+        if self.stale:
+            # Late response never came, carry on with the next request
+            self.stale = False
+            self.checkQueue()
+            return
+
         self.timeoutRequest()
-        self.transport.abortConnection()
+        self.consecutive_timeouts += 1
+        if self.consecutive_timeouts >= self.factory.max_timeouts:
+            self.factory.logger.error("%d consecutive requests timed out, reconnecting", self.consecutive_timeouts)
+            self.transport.abortConnection()
+            return
+
+        # A late response would be taken for the response to the next request, wait for it to discard it
+        self.stale = True
+        self.setTimeout(self.factory.stale_timeout)
 
     def timeoutRequest(self):
         if self.request:
             self.factory.logger.error("Request %s timed out", self.request)
+            exc = RequestTimeoutException(self.request)
+            if self.factory.metrics is not None:
+                self.factory.metrics.request_failed(self.request, exc)
             if self.request.deferred:
-                self.request.deferred.errback(RequestTimeoutException(self.request))
+                self.request.deferred.errback(exc)
+
+            request, self.request = self.request, None
+            self.factory.requestDone(self, request)
 
     def checkQueue(self):
-        if not self.queue:
+        if self.queue is None or self.request is not None or self.waiting is not None or self.stale:
             return
 
-        try:
-            item = self.queue.get(block=False)
-            self.transport.write(item.build())
-            self.factory.logger.debug("Sent request: %s", item)
+        self.waiting = self.queue.get()
+        self.waiting.addCallbacks(self.sendRequest, self.cancelledWaiting)
+
+    def cancelledWaiting(self, failure):
+        self.waiting = None
+        failure.trap(defer.CancelledError)
+
+    def sendRequest(self, item):
+        self.waiting = None
+        if self.factory.metrics is not None:
+            self.factory.metrics.request_sent(item)
+            self.factory.metrics.set_in_flight(self.peer_id, 1)
+            self.factory.metrics.set_queue_depth(self.peer_id, self.queue.qsize())
+        self.transport.write(item.data)
+        self.sent_at = time.monotonic()
+        self.factory.logger.debug("Sent request: %s", item)
 
-            if self.factory.timeout:
-                self.setTimeout(self.factory.timeout)
+        if self.factory.timeout:
+            self.setTimeout(self.factory.timeout)
 
-            self.request = item
-        except queue.Empty:
-            reactor.callLater(0.5, self.checkQueue)
+        self.request = item
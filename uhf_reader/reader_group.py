@@ -0,0 +1,163 @@
+import queue
+
+from collections import defaultdict
+
+from twisted.internet import defer, reactor
+from twisted.python import threadable
+
+from uhf_reader.constants import PRIORITY_NORMAL
+
+
+class UHFReaderGroup:
+    """
+    Group of readers covering the same station, accepting requests like :class:`UHFRequestQueue`, so it can be
+    passed to :class:`AsyncUHFReader` as its queue.
+
+    Requests wait in the group backlog and are handed to the connected member with the lowest expected
+    completion time, estimated from its queue depth and smoothed response latency. Each member is given at most
+    `prefetch` requests at a time, so the backlog keeps flowing to whichever reader frees up first. Readers which
+    are down or reconnecting are skipped, requests queued on or in flight to a reader which lost its connection
+    return to the backlog.
+
+    The backlog is bounded by the `high_water` and `low_water` marks of the factory, see :class:`UHFRequestQueue`.
+    """
+    prefetch = 2
+
+    def __init__(self, factory, name: str, peers=()) -> None:
+        self.factory = factory
+        self.name = name
+        self.peers = []
+        self.backlog = factory.createQueue()
+        self.assigned = defaultdict(list)
+
+        for peer_id in peers:
+            self.add(peer_id)
+
+    def add(self, peer_id: str) -> None:
+        """
+        Add reader to the group
+        :param peer_id: Reader `host:port`
+        """
+        if peer_id not in self.peers:
+            self.peers.append(peer_id)
+            self.dispatch()
+
+    def remove(self, peer_id: str) -> None:
+        """
+        Remove reader from the group, requests not sent to it yet return to the backlog
+        :param peer_id: Reader `host:port`
+        """
+        self.peers.remove(peer_id)
+        self.reader_lost(peer_id, None)
+
+    def put(self, request, block: bool = True) -> None:
+        """
+        Submit request to the group
+        :param request: :class:`UHFRequest`
+        :param block: If the backlog is full, hold the request until it drains instead of failing it
+        """
+        if not threadable.isInIOThread():
+            reactor.callFromThread(self.put, request, block)
+            return
+
+        self.backlog.put(request, block=block)
+        self.dispatch()
+
+    def open_session(self, priority: int = PRIORITY_NORMAL, deadline: float = None) -> defer.Deferred:
+        """
+        Request exclusive use of the least loaded connected member, see :meth:`UHFRequestQueue.open_session`.
+        Requests of a session are not moved to other members if the connection is lost.
+        :param priority: Priority of the session among queued requests
+        :param deadline: :func:`time.monotonic` time by which the session must become active
+        :return: Deferred firing with active :class:`UHFSession`
+        """
+        peer_id = self.__select(capped=False)
+        if peer_id is None:
+            peer_id = self.peers[0]
+        return self.factory.getQueue(peer_id).open_session(priority, deadline)
+
+    def qsize(self) -> int:
+        return self.backlog.qsize()
+
+    def empty(self) -> bool:
+        return self.backlog.empty()
+
+    def full(self) -> bool:
+        return self.backlog.full()
+
+    def wait_capacity(self) -> defer.Deferred:
+        return self.backlog.wait_capacity()
+
+    def add_depth_callback(self, callback) -> None:
+        self.backlog.add_depth_callback(callback)
+
+    def load(self, peer_id: str) -> int:
+        """
+        Get number of requests queued on the reader or in flight to it
+        :param peer_id: Reader `host:port`
+        """
+        protocol = self.factory.protocols.get(peer_id)
+        in_flight = 1 if protocol is not None and protocol.request is not None else 0
+        return self.factory.getQueue(peer_id).qsize() + in_flight
+
+    def dispatch(self) -> None:
+        """
+        Hand backlog requests to members having spare capacity
+        """
+        while not self.backlog.empty():
+            peer_id = self.__select()
+            if peer_id is None:
+                return
+
+            try:
+                request = self.backlog.get_nowait()
+            except queue.Empty:
+                # Only expired requests were left
+                return
+
+            self.assigned[peer_id].append(request)
+            self.factory.getQueue(peer_id).put(request)
+
+    def __select(self, capped: bool = True):
+        best, best_score = None, None
+        for peer_id in self.peers:
+            if peer_id not in self.factory.protocols:
+                continue
+            load = self.load(peer_id)
+            if capped and load >= self.prefetch:
+                continue
+            score = (load + 1) * self.factory.getLatency(peer_id)
+            if best_score is None or score < best_score:
+                best, best_score = peer_id, score
+        return best
+
+    def request_done(self, peer_id: str, request) -> None:
+        """
+        Account for request answered or failed by a member
+        :param peer_id: Reader `host:port`
+        :param request: :class:`UHFRequest`
+        """
+        assigned = self.assigned.get(peer_id)
+        if assigned and request in assigned:
+            assigned.remove(request)
+        self.dispatch()
+
+    def reader_lost(self, peer_id: str, request) -> bool:
+        """
+        Return requests assigned to a member which lost its connection to the backlog
+        :param peer_id: Reader `host:port`
+        :param request: :class:`UHFRequest` in flight when the connection was lost or `None`
+        :return: `True` if the in-flight request belonged to the group and was requeued
+        """
+        requeued = False
+        reader_queue = self.factory.getQueue(peer_id)
+        for item in self.assigned.pop(peer_id, []):
+            if item is not request and not reader_queue.remove(item):
+                continue
+            if item.deferred and item.deferred.called:
+                continue
+            self.backlog.put(item)
+            requeued = requeued or item is request
+
+        self.dispatch()
+        return requeued
@@ -1,36 +1,58 @@
+from uhf_reader.codec import encode_frame, PASSWORD_BANK_PARAM, PASSWORD_BANK_PARAM_COUNT, RADIO_POWER
 from uhf_reader.packet import UHFPacket
 from uhf_reader.response import UHFResponse, GetFirmwareVersionResponse, GetRadioPowerResponse, \
     GetRadioFrequencyResponse, Gen2SecuredReadResponse
-from uhf_reader.exceptions import InvalidParameterException
+from uhf_reader.exceptions import InvalidParameterException, InvalidPacketException
 
 from uhf_reader.constants import GET_FIRMWARE_VERSION, RESET_READER, SET_RADIO_POWER, GET_RADIO_POWER, \
     SET_RADIO_FREQUENCY, GET_RADIO_FREQUENCY, RADIO_FREQUENCY_CHINA, RADIO_FREQUENCY_USA, RADIO_FREQUENCY_EUROPE, \
     GEN2_SECURED_READ, GEN2_SECURED_WRITE, GEN2_SECURED_LOCK
-from uhf_reader.constants import EPC, USER, UNLOCK
+from uhf_reader.constants import EPC, USER, UNLOCK, PRIORITY_NORMAL
 
 
 class UHFRequest(UHFPacket):
-    def __init__(self, command: bytes, args: bytes = b"") -> None:
-        self.command = command
-        self.args = args
+    """
+    Request frame. Only the built frame is stored, command and arguments are sliced from it on access.
+    """
+    __slots__ = ('deferred', 'priority', 'deadline', 'queued_at', 'sent_at', 'received_at')
 
-        if len(self.command) > 1:
+    def __init__(self, command: bytes, args: bytes = b"") -> None:
+        if len(command) > 1:
             raise InvalidParameterException("command must be 1 byte long")
 
         self.deferred = None
+        self.priority = PRIORITY_NORMAL
+        self.deadline = None
+        self.queued_at = None
+        self.sent_at = None
+        self.received_at = None
 
-        super().__init__(self.build())
+        self.data = self.encode(command, args)
 
-    def build(self) -> bytes:
-        head = b"\x0A"
-        addr = b"\xFF"
+    @property
+    def command(self) -> bytes:
+        return self.data[3:4]
 
-        length = (len(self.command) + len(self.args) + 1).to_bytes(1, byteorder="big")
+    @property
+    def args(self) -> bytes:
+        return self.data[4:-1]
 
-        packet = addr + length + self.command + self.args
-        crc = self.calculate_checksum(packet).to_bytes(1, byteorder='big')
+    def build(self) -> bytes:
+        """
+        Get the request frame
+        :return: Frame bytes
+        """
+        return self.data
 
-        return head + packet + crc
+    @staticmethod
+    def encode(command: bytes, args: bytes = b"") -> bytes:
+        """
+        Encode request frame
+        :param command: Command byte
+        :param args: Command arguments
+        :return: Frame bytes
+        """
+        return encode_frame(command, args)
 
     @staticmethod
     def parse_response(data: bytes) -> UHFResponse:
@@ -38,16 +60,12 @@ class UHFRequest(UHFPacket):
 
     @staticmethod
     def _get_password_bank_param(password: int, bank: int, param: int) -> bytes:
-        value = (password >> 24 & 0xff).to_bytes(1, byteorder='big')
-        value += (password >> 16 & 0xff).to_bytes(1, byteorder='big')
-        value += (password >> 8 & 0xff).to_bytes(1, byteorder='big')
-        value += (password & 0xff).to_bytes(1, byteorder='big')
-        value += bank.to_bytes(1, byteorder='big')
-        value += int(param).to_bytes(1, byteorder='big')
-        return value
+        return PASSWORD_BANK_PARAM.pack(password & 0xffffffff, bank, int(param))
 
 
 class GetFirmwareVersionRequest(UHFRequest):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(GET_FIRMWARE_VERSION)
 
@@ -57,21 +75,22 @@ class GetFirmwareVersionRequest(UHFRequest):
 
 
 class ResetReaderRequest(UHFRequest):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(RESET_READER)
 
 
 class SetRadioPowerRequest(UHFRequest):
-    def __init__(self, power1: int = 20, power2: int = 2, power3: int = 32, power4: int = 0) -> None:
-        args = power1.to_bytes(1, byteorder='big')
-        args += power2.to_bytes(1, byteorder='big')
-        args += power3.to_bytes(1, byteorder='big')
-        args += power4.to_bytes(1, byteorder='big')
+    __slots__ = ()
 
-        super().__init__(SET_RADIO_POWER, args)
+    def __init__(self, power1: int = 20, power2: int = 2, power3: int = 32, power4: int = 0) -> None:
+        super().__init__(SET_RADIO_POWER, RADIO_POWER.pack(power1, power2, power3, power4))
 
 
 class GetRadioPowerRequest(UHFRequest):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(GET_RADIO_POWER)
 
@@ -81,6 +100,8 @@ class GetRadioPowerRequest(UHFRequest):
 
 
 class SetRadioFrequencyRequest(UHFRequest):
+    __slots__ = ()
+
     def __init__(self, region: int) -> None:
         if region not in [RADIO_FREQUENCY_CHINA, RADIO_FREQUENCY_USA, RADIO_FREQUENCY_EUROPE]:
             raise InvalidParameterException("invalid radio frequency")
@@ -89,6 +110,8 @@ class SetRadioFrequencyRequest(UHFRequest):
 
 
 class GetRadioFrequencyRequest(UHFRequest):
+    __slots__ = ()
+
     def __init__(self) -> None:
         super().__init__(GET_RADIO_FREQUENCY)
 
@@ -98,21 +121,27 @@ class GetRadioFrequencyRequest(UHFRequest):
 
 
 class Gen2SecuredReadRequest(UHFRequest):
+    __slots__ = ('addr', 'count')
+
     def __init__(self, password: int = 0, bank: int = EPC, addr: int = 0, count: int = 4) -> None:
-        args = self._get_password_bank_param(password, bank, addr)
-        args += count.to_bytes(1, byteorder='big')
+        args = PASSWORD_BANK_PARAM_COUNT.pack(password & 0xffffffff, bank, addr, count)
 
         self.addr = addr
         self.count = count
 
         super().__init__(GEN2_SECURED_READ, args)
 
-    @staticmethod
-    def parse_response(data: bytes) -> Gen2SecuredReadResponse:
-        return Gen2SecuredReadResponse(data)
+    def parse_response(self, data: bytes) -> Gen2SecuredReadResponse:
+        response = Gen2SecuredReadResponse(data)
+        # Response of another request, e.g. when the reader skipped one of pipelined requests
+        if len(response.payload) != self.count * 2:
+            raise InvalidPacketException("response length does not match request")
+        return response
 
 
 class Gen2SecuredWriteRequest(UHFRequest):
+    __slots__ = ('addr',)
+
     def __init__(self, data: bytes, password: int = 0, bank: int = USER, addr: int = 0) -> None:
         if len(data) != 2:
             raise InvalidParameterException("data must be 2 bytes long")
@@ -126,6 +155,8 @@ class Gen2SecuredWriteRequest(UHFRequest):
 
 
 class Gen2SecuredLockRequest(UHFRequest):
+    __slots__ = ()
+
     def __init__(self, password: int = 0, bank: int = USER, level: int = UNLOCK) -> None:
         args = self._get_password_bank_param(password, bank, level)
 
@@ -0,0 +1,331 @@
+import queue
+import time
+
+from collections import defaultdict, deque
+
+from twisted.internet import defer, reactor
+from twisted.python import threadable
+
+from uhf_reader.exceptions import RequestExpiredException, InvalidParameterException, QueueFullException
+from uhf_reader.constants import PRIORITY_NORMAL
+
+
+class UHFSession:
+    """
+    Exclusive use of a reader connection, obtained from :meth:`UHFRequestQueue.open_session`.
+
+    Once the session is active, only requests submitted through it are sent, back to back, while requests
+    of other callers wait in the queue until the session is closed. A session must always be closed,
+    :meth:`AsyncUHFReader.transaction` does that once its operation finishes or fails.
+    """
+    def __init__(self, queue: 'UHFRequestQueue', priority: int = PRIORITY_NORMAL, deadline: float = None) -> None:
+        self.queue = queue
+        self.priority = priority
+        self.deadline = deadline
+        self.deferred = defer.Deferred()
+        self.pending = deque()
+        self.closed = False
+
+    def put(self, request, block: bool = True) -> None:
+        """
+        Submit request within the session, requests of an active session are never held back by the queue bound
+        :param request: :class:`UHFRequest`
+        :param block: Ignored, accepted for compatibility with :meth:`UHFRequestQueue.put`
+        """
+        self.queue.put(request, session=self)
+
+    def close(self) -> None:
+        """
+        Release the connection to other callers
+        """
+        self.queue.close_session(self)
+
+
+class UHFRequestQueue:
+    """
+    Reactor-native request scheduler waking up the consumer as soon as a request is submitted.
+    Requests may be submitted both from the reactor thread and from foreign threads.
+
+    Requests are dispatched by `priority` (lower first), FIFO within the same priority. Every `aging_interval`
+    seconds of waiting promotes a request by one priority level, so low priority requests are not starved.
+    Requests whose `deadline` (:func:`time.monotonic` based) passes before dispatch are failed with
+    :class:`RequestExpiredException` without being sent.
+
+    Sessions opened by :meth:`open_session` are scheduled like requests, when one reaches the head of the
+    queue it takes over the connection until closed.
+
+    With `high_water` set the queue is bounded: once that many requests are queued, the queue is full until
+    it drains down to `low_water` (half of `high_water` by default). Requests submitted meanwhile wait outside
+    the queue, up to `max_held` of them (`high_water` by default), or fail with :class:`QueueFullException`.
+    Producers may throttle themselves using :meth:`wait_capacity` or callbacks registered with
+    :meth:`add_depth_callback`.
+    """
+    aging_interval = 1.0
+    high_water = None
+    low_water = None
+    max_held = None
+
+    def __init__(self, aging_interval: float = None, high_water: int = None, low_water: int = None,
+                 max_held: int = None) -> None:
+        if aging_interval is not None:
+            self.aging_interval = aging_interval
+        if high_water is not None:
+            self.high_water = high_water
+            self.low_water = low_water if low_water is not None else high_water // 2
+            self.max_held = max_held if max_held is not None else high_water
+        if self.low_water is not None and self.high_water is not None and self.low_water >= self.high_water:
+            raise InvalidParameterException("low_water must be lower than high_water")
+
+        self.pending = defaultdict(deque)
+        self.waiters = deque()
+        self.expirations = {}
+        self.session = None
+        self.throttled = False
+        self.overflow = deque()
+        self.capacity_waiters = []
+        self.depth_callbacks = []
+
+    def put(self, request, session: UHFSession = None, block: bool = True) -> None:
+        """
+        Submit request, handing it over immediately to a waiting consumer if there is one
+        :param request: :class:`UHFRequest`
+        :param session: Active :class:`UHFSession` the request belongs to, not subject to the queue bound
+        :param block: If the queue is full, hold the request until it drains instead of failing it
+            with :class:`QueueFullException`. Requests beyond `max_held` held ones fail regardless.
+        """
+        if not threadable.isInIOThread():
+            reactor.callFromThread(self.put, request, session, block)
+            return
+
+        if session is not None:
+            if session is not self.session:
+                raise InvalidParameterException("session is not active")
+            if self.waiters:
+                self.waiters.popleft().callback(request)
+            else:
+                session.pending.append(request)
+            return
+
+        now = time.monotonic()
+        if request.deadline is not None and request.deadline <= now:
+            self.__fail(request)
+            return
+
+        if self.waiters and self.session is None:
+            if isinstance(request, UHFSession):
+                self.__activate(request)
+            else:
+                self.waiters.popleft().callback(request)
+            return
+
+        if self.throttled and (not block or len(self.overflow) >= self.max_held):
+            self.__fail(request, QueueFullException(request))
+            return
+
+        if request.deadline is not None:
+            self.expirations[id(request)] = reactor.callLater(request.deadline - now, self.__expire, request)
+        if self.throttled:
+            self.overflow.append(request)
+            return
+
+        self.pending[request.priority].append((now, request))
+
+        if self.high_water is not None and self.qsize() >= self.high_water:
+            self.throttled = True
+            self.__notify_depth()
+
+    def get(self) -> defer.Deferred:
+        """
+        Get next request
+        :return: Deferred firing with the next submitted request, may be cancelled
+        """
+        request = self.__next()
+        if request is not None:
+            return defer.succeed(request)
+
+        deferred = defer.Deferred(canceller=self.__cancel_get)
+        self.waiters.append(deferred)
+        return deferred
+
+    def get_nowait(self):
+        """
+        Get next request without waiting
+        :raises: :class:`queue.Empty`
+        """
+        request = self.__next()
+        if request is None:
+            raise queue.Empty
+        return request
+
+    def __next(self):
+        request = self.__pop()
+        # Expired requests dropped by __pop drain the queue too, held requests may take their place
+        self.__drained()
+        if request is None:
+            request = self.__pop()
+        return request
+
+    def qsize(self) -> int:
+        size = sum(len(pending) for pending in self.pending.values())
+        return size + len(self.session.pending) if self.session is not None else size
+
+    def empty(self) -> bool:
+        return self.qsize() == 0
+
+    def full(self) -> bool:
+        """
+        Tell whether the queue reached its high water mark and did not drain to the low water mark yet
+        """
+        return self.throttled
+
+    def wait_capacity(self) -> defer.Deferred:
+        """
+        Wait until the queue accepts requests without holding them
+        :return: Deferred firing with `None` right away or once the queue drains to its low water mark
+        """
+        if not self.throttled:
+            return defer.succeed(None)
+        deferred = defer.Deferred()
+        self.capacity_waiters.append(deferred)
+        return deferred
+
+    def add_depth_callback(self, callback) -> None:
+        """
+        Register callback called with the queue depth and whether the queue is full whenever it becomes full
+        or drains to its low water mark
+        :param callback: Callable receiving depth and full flag
+        """
+        self.depth_callbacks.append(callback)
+
+    def __notify_depth(self) -> None:
+        depth = self.qsize()
+        for callback in self.depth_callbacks:
+            callback(depth, self.throttled)
+
+    def __drained(self) -> None:
+        if not self.throttled or self.qsize() > self.low_water:
+            return
+
+        self.throttled = False
+        self.__notify_depth()
+
+        # Held requests come first, then producers waiting for capacity, while the queue stays below its bound
+        while self.overflow and not self.throttled:
+            request = self.overflow.popleft()
+            self.__cancel_expiration(request)
+            self.put(request)
+        if not self.throttled:
+            waiters, self.capacity_waiters = self.capacity_waiters, []
+            for deferred in waiters:
+                deferred.callback(None)
+
+    def open_session(self, priority: int = PRIORITY_NORMAL, deadline: float = None) -> defer.Deferred:
+        """
+        Request exclusive use of the connection
+        :param priority: Priority of the session among queued requests
+        :param deadline: :func:`time.monotonic` time by which the session must become active
+        :return: Deferred firing with active :class:`UHFSession`
+        """
+        session = UHFSession(self, priority, deadline)
+        self.put(session)
+        return session.deferred
+
+    def close_session(self, session: UHFSession) -> None:
+        """
+        End session, withdrawing it from the queue if it is not active yet
+        :param session: :class:`UHFSession`
+        """
+        if not threadable.isInIOThread():
+            reactor.callFromThread(self.close_session, session)
+            return
+
+        if session.closed:
+            return
+        session.closed = True
+
+        if session is not self.session:
+            self.remove(session)
+            return
+
+        self.session = None
+        # Requests held back by the session go to the consumer waiting meanwhile
+        while self.waiters:
+            request = self.__pop()
+            if request is None:
+                break
+            self.waiters.popleft().callback(request)
+        self.__drained()
+
+    def __activate(self, session: UHFSession) -> None:
+        self.session = session
+        session.deferred.callback(session)
+
+    def __pop(self):
+        if self.session is not None:
+            return self.session.pending.popleft() if self.session.pending else None
+
+        now = time.monotonic()
+        while True:
+            best, best_rank = None, None
+            for priority, pending in self.pending.items():
+                if not pending:
+                    continue
+                # Head is the oldest request of its priority, hence the most promoted one
+                rank = priority - (now - pending[0][0]) / self.aging_interval
+                if best_rank is None or rank < best_rank:
+                    best, best_rank = pending, rank
+
+            if best is None:
+                return None
+
+            _, request = best.popleft()
+            self.__cancel_expiration(request)
+
+            if request.deadline is not None and request.deadline <= now:
+                self.__fail(request)
+                continue
+
+            if isinstance(request, UHFSession):
+                # Callbacks of the session may submit its first request right away
+                self.__activate(request)
+                return self.__pop()
+
+            return request
+
+    def remove(self, request) -> bool:
+        """
+        Withdraw queued request
+        :param request: :class:`UHFRequest`
+        :return: `True` if the request was queued, `False` if it was already dispatched or never queued
+        """
+        pending = self.pending[request.priority]
+        for idx, (_, item) in enumerate(pending):
+            if item is request:
+                del pending[idx]
+                self.__cancel_expiration(request)
+                self.__drained()
+                return True
+
+        if request in self.overflow:
+            self.overflow.remove(request)
+            self.__cancel_expiration(request)
+            return True
+        return False
+
+    def __cancel_expiration(self, request) -> None:
+        expiration = self.expirations.pop(id(request), None)
+        if expiration is not None and expiration.active():
+            expiration.cancel()
+
+    def __expire(self, request) -> None:
+        self.expirations.pop(id(request), None)
+        if self.remove(request):
+            self.__fail(request)
+
+    @staticmethod
+    def __fail(request, exc: Exception = None) -> None:
+        if request.deferred:
+            request.deferred.errback(exc if exc is not None else RequestExpiredException(request))
+
+    def __cancel_get(self, deferred) -> None:
+        self.waiters.remove(deferred)
@@ -7,8 +7,17 @@ from uhf_reader.constants import RADIO_FREQUENCY_CUSTOM
 
 
 class UHFResponse(UHFPacket):
+    """
+    Response frame. Fields are decoded on access straight from the received frame, so parsing a response
+    allocates nothing besides the object itself until :meth:`value` is called.
+    """
+    __slots__ = ()
+
+    # Offset of the value within the frame, after header, address, length and status
+    payload_offset = 4
+
     def __init__(self, data: bytes) -> None:
-        super().__init__(data)
+        self.data = data
 
         if len(data) < 5:
             raise InvalidPacketException("response too short")
@@ -16,25 +25,46 @@ class UHFResponse(UHFPacket):
         if data[0] != 0x0b:
             raise InvalidPacketException("invalid response header")
 
-        self.addr = data[1]
-        self.length = data[2]
-
-        if len(data) != self.length + 3:
+        if len(data) != data[2] + 3:
             raise InvalidPacketException("response too short")
 
-        self.status = data[3]
-        self.payload = data[4:-1]
-        self.checksum = data[-1]
-
         self.validate_response()
 
+    @property
+    def addr(self) -> int:
+        return self.data[1]
+
+    @property
+    def length(self) -> int:
+        return self.data[2]
+
+    @property
+    def status(self) -> int:
+        return self.data[3]
+
+    @property
+    def checksum(self) -> int:
+        return self.data[-1]
+
+    @property
+    def payload(self) -> bytes:
+        return self.data[self.payload_offset:-1]
+
+    def payload_view(self) -> memoryview:
+        """
+        Get payload without copying it
+        :return: Read-only memoryview of the payload within the frame
+        """
+        return memoryview(self.data)[self.payload_offset:-1]
+
     def validate_checksum(self) -> None:
-        if self.calculate_checksum(self.data[:-1]) != self.checksum:
+        # Checksum is the two's complement of the sum of all preceding bytes, so the whole frame sums to zero
+        if sum(self.data) & 0xff:
             raise InvalidChecksumException()
 
     def raise_on_status(self) -> None:
-        if self.status != 0:
-            raise ErrorResponseException(code=self.status)
+        if self.data[3] != 0:
+            raise ErrorResponseException(code=self.data[3])
 
     def validate_response(self) -> None:
         self.validate_checksum()
@@ -45,41 +75,56 @@ class UHFResponse(UHFPacket):
 
 
 class GetFirmwareVersionResponse(UHFResponse):
-    def __init__(self, data: bytes) -> None:
-        super().__init__(data)
+    __slots__ = ()
 
-        self.major = self.payload[0]
-        self.minor = self.payload[1]
+    @property
+    def major(self) -> int:
+        return self.data[4]
+
+    @property
+    def minor(self) -> int:
+        return self.data[5]
 
     def value(self) -> Tuple[int, int]:
-        return self.major, self.minor
+        return self.data[4], self.data[5]
 
 
 class GetRadioPowerResponse(UHFResponse):
-    def __init__(self, data: bytes) -> None:
-        super().__init__(data)
+    __slots__ = ()
 
-        self.power1 = self.payload[0]
-        self.power2 = self.payload[1]
-        self.power3 = self.payload[2]
-        self.power4 = self.payload[3]
+    @property
+    def power1(self) -> int:
+        return self.data[4]
+
+    @property
+    def power2(self) -> int:
+        return self.data[5]
+
+    @property
+    def power3(self) -> int:
+        return self.data[6]
+
+    @property
+    def power4(self) -> int:
+        return self.data[7]
 
     def value(self) -> Tuple[int, int, int, int]:
-        return self.power1, self.power2, self.power3, self.power4
+        return self.data[4], self.data[5], self.data[6], self.data[7]
 
 
 class GetRadioFrequencyResponse(UHFResponse):
-    def __init__(self, data: bytes) -> None:
-        super().__init__(data)
+    __slots__ = ()
 
-        self.region = self.payload[1] if self.payload[0] == 0 else RADIO_FREQUENCY_CUSTOM
+    @property
+    def region(self) -> int:
+        return self.data[5] if self.data[4] == 0 else RADIO_FREQUENCY_CUSTOM
 
     def value(self) -> int:
         return self.region
 
 
 class Gen2SecuredReadResponse(UHFResponse):
-    def __init__(self, data: bytes):
-        super().__init__(data)
+    __slots__ = ()
 
-        self.payload = self.payload[1:]
+    # Payload starts with antenna number
+    payload_offset = 5
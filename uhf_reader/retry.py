@@ -0,0 +1,44 @@
+
+from .constants import STATUS_NO_TAG, STATUS_TAG_READ_FAILED, STATUS_TAG_WRITE_FAILED
+from .exceptions import ErrorResponseException
+
+
+class RetryPolicy:
+    """
+    Bounded exponential backoff for chunks of multi-request transfers failing with transient tag errors,
+    typically caused by marginal RF coupling. Chunks transferred before the failure are kept, only the
+    failed chunk and the ones following it are sent again. The attempt count is reset once a chunk succeeds.
+    """
+    attempts = 3
+    initial_delay = 0.05
+    factor = 2.0
+    max_delay = 1.0
+    statuses = (STATUS_NO_TAG, STATUS_TAG_READ_FAILED, STATUS_TAG_WRITE_FAILED)
+
+    def __init__(self, *args, **kwargs):
+        if len(kwargs):
+            self.attempts = kwargs.get('attempts', self.attempts)
+            self.initial_delay = kwargs.get('initial_delay', self.initial_delay)
+            self.factor = kwargs.get('factor', self.factor)
+            self.max_delay = kwargs.get('max_delay', self.max_delay)
+            self.statuses = tuple(kwargs.get('statuses', self.statuses))
+
+    def retryable(self, exc: Exception, attempt: int) -> bool:
+        """
+        Tell whether a chunk failed with given exception should be sent again
+        :param exc: Exception raised for the chunk
+        :param attempt: Number of retries of this chunk done so far
+        """
+        return attempt < self.attempts and isinstance(exc, ErrorResponseException) and exc.code in self.statuses
+
+    def delay(self, attempt: int) -> float:
+        """
+        Get delay before the next retry
+        :param attempt: Number of retries of this chunk done so far
+        :return: Delay in seconds
+        """
+        return min(self.initial_delay * self.factor ** attempt, self.max_delay)
+
+
+# Policy used by the clients unless configured otherwise, pass `retry_policy=None` to disable retries
+DEFAULT_RETRY_POLICY = RetryPolicy()
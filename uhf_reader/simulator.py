@@ -0,0 +1,374 @@
+"""
+Local stand-in for the MR6100 reader speaking its binary protocol over TCP or a pseudo terminal.
+
+Simulates tags with memory banks and lock state, RF power and region settings, and can inject latency,
+jitter, segment splitting, error statuses and dropped responses. Run it standalone with
+`python -m uhf_reader.simulator --port 10100`.
+"""
+import argparse
+import logging
+import os
+import random
+import socket
+import socketserver
+import struct
+import threading
+import time
+
+from typing import Iterable, Optional
+
+from uhf_reader.codec import REQUEST_HEADER, PASSWORD_BANK_PARAM, checksum
+from uhf_reader.decoder import UHFFrameDecoder, RESPONSE_HEADER
+from uhf_reader.constants import RESET_READER, GET_FIRMWARE_VERSION, SET_RADIO_POWER, GET_RADIO_POWER, \
+    SET_RADIO_FREQUENCY, GET_RADIO_FREQUENCY, GEN2_SECURED_READ, GEN2_SECURED_WRITE, GEN2_SECURED_LOCK, \
+    RADIO_FREQUENCY_CHINA, RADIO_FREQUENCY_EUROPE, RESERVED, EPC, TID, USER, \
+    UNLOCK, UNLOCK_FOREVER, SECURE_LOCK, LOCK_FOREVER, STATUS_NO_TAG, STATUS_TAG_READ_FAILED, STATUS_TAG_WRITE_FAILED
+
+STATUS_OK = 0x00
+STATUS_GENERAL_ERROR = 0x01
+STATUS_PARAMETER_SET_FAILED = 0x02
+STATUS_TAG_LOCK_FAILED = 0x07
+
+TAG_COMMANDS = (GEN2_SECURED_READ[0], GEN2_SECURED_WRITE[0], GEN2_SECURED_LOCK[0])
+
+
+class SimulatedTag:
+    """
+    Gen2 tag with RESERVED, EPC, TID and USER memory banks
+    """
+    def __init__(self, epc: bytes = None, tid: bytes = None, user: bytes = None, password: int = 0) -> None:
+        epc = epc if epc is not None else os.urandom(12)
+        tid = tid if tid is not None else b"\xE2\x00\x34\x12" + os.urandom(12)
+        user = user if user is not None else bytes(64)
+
+        self.banks = {
+            RESERVED: bytearray(4) + bytearray(password.to_bytes(4, byteorder='big')),
+            # CRC-16, protocol control word announcing EPC length and the EPC itself
+            EPC: bytearray(2) + bytearray(((len(epc) // 2) << 11).to_bytes(2, byteorder='big')) + bytearray(epc),
+            TID: bytearray(tid),
+            USER: bytearray(user),
+        }
+        self.locks = {bank: UNLOCK for bank in self.banks}
+
+    @property
+    def epc(self) -> bytes:
+        return bytes(self.banks[EPC][4:])
+
+    @property
+    def tid(self) -> bytes:
+        return bytes(self.banks[TID])
+
+    @property
+    def password(self) -> int:
+        return int.from_bytes(self.banks[RESERVED][4:8], byteorder='big')
+
+    def read(self, password: int, bank: int, addr: int, count: int) -> Optional[bytes]:
+        memory = self.banks.get(bank)
+        if memory is None or (addr + count) * 2 > len(memory):
+            return None
+        if bank == RESERVED and self.locks[bank] in (SECURE_LOCK, LOCK_FOREVER) and password != self.password:
+            return None
+        return bytes(memory[addr * 2:(addr + count) * 2])
+
+    def write(self, password: int, bank: int, addr: int, data: bytes) -> bool:
+        memory = self.banks.get(bank)
+        if memory is None or bank == TID or (addr + 1) * 2 > len(memory):
+            return False
+        if self.locks[bank] == LOCK_FOREVER:
+            return False
+        if self.locks[bank] == SECURE_LOCK and password != self.password:
+            return False
+        memory[addr * 2:addr * 2 + 2] = data
+        return True
+
+    def lock(self, password: int, bank: int, level: int) -> bool:
+        if bank not in self.locks or level not in (UNLOCK, UNLOCK_FOREVER, SECURE_LOCK, LOCK_FOREVER):
+            return False
+        if self.locks[bank] in (UNLOCK_FOREVER, LOCK_FOREVER) or password != self.password:
+            return False
+        self.locks[bank] = level
+        return True
+
+
+class ReaderSimulator:
+    """
+    Protocol engine of the simulated reader, turning request frames into response frames.
+
+    The first tag in `tags` is the one in the RF field; an empty list simulates an empty field.
+    Fault injection settings may be changed at any time.
+    """
+    def __init__(self, tags: Iterable[SimulatedTag] = None, firmware: tuple = (6, 3), latency: float = 0.0,
+                 jitter: float = 0.0, segment_size: int = None, error_rate: float = 0.0,
+                 error_codes: Iterable[int] = (STATUS_NO_TAG, STATUS_TAG_READ_FAILED, STATUS_TAG_WRITE_FAILED),
+                 drop_rate: float = 0.0, seed: int = None) -> None:
+        self.tags = list(tags) if tags is not None else [SimulatedTag()]
+        self.firmware = firmware
+        self.power = [20, 2, 32, 0]
+        self.region = RADIO_FREQUENCY_EUROPE
+        self.latency = latency
+        self.jitter = jitter
+        self.segment_size = segment_size
+        self.error_rate = error_rate
+        self.error_codes = tuple(error_codes)
+        self.drop_rate = drop_rate
+        self.random = random.Random(seed)
+        self.requests = 0
+        self.lock = threading.Lock()
+        self.logger = logging.getLogger(__name__)
+
+    @staticmethod
+    def build_response(status: int, payload: bytes = b"") -> bytes:
+        frame = bytes((RESPONSE_HEADER, 0xff, len(payload) + 2, status)) + payload
+        return frame + bytes((checksum(frame),))
+
+    def delay(self) -> float:
+        """
+        Get time to wait before responding
+        """
+        if self.jitter:
+            return max(self.latency + self.random.uniform(-self.jitter, self.jitter), 0.0)
+        return self.latency
+
+    def handle(self, frame: bytes) -> Optional[bytes]:
+        """
+        Handle request frame
+        :param frame: Complete request frame
+        :return: Response frame or `None` if the response is dropped
+        """
+        with self.lock:
+            self.requests += 1
+
+            if checksum(frame[1:-1]) != frame[-1]:
+                return self.build_response(STATUS_GENERAL_ERROR)
+
+            if self.drop_rate and self.random.random() < self.drop_rate:
+                return None
+
+            command, args = frame[3], frame[4:-1]
+            if command in TAG_COMMANDS and self.error_rate and self.random.random() < self.error_rate:
+                return self.build_response(self.random.choice(self.error_codes))
+
+            try:
+                return self.__dispatch(command, args)
+            except (IndexError, struct.error):
+                return self.build_response(STATUS_GENERAL_ERROR)
+
+    def __dispatch(self, command: int, args: bytes) -> Optional[bytes]:
+        if command == RESET_READER[0]:
+            # Reader restarts instead of responding
+            self.power = [20, 2, 32, 0]
+            self.region = RADIO_FREQUENCY_EUROPE
+            return None
+
+        if command == GET_FIRMWARE_VERSION[0]:
+            return self.build_response(STATUS_OK, bytes(self.firmware))
+
+        if command == SET_RADIO_POWER[0]:
+            if len(args) != 4 or any(power > 32 for power in args):
+                return self.build_response(STATUS_PARAMETER_SET_FAILED)
+            self.power = list(args)
+            return self.build_response(STATUS_OK)
+
+        if command == GET_RADIO_POWER[0]:
+            return self.build_response(STATUS_OK, bytes(self.power))
+
+        if command == SET_RADIO_FREQUENCY[0]:
+            if len(args) != 2 or args[0] != 0 or not RADIO_FREQUENCY_CHINA <= args[1] <= RADIO_FREQUENCY_EUROPE:
+                return self.build_response(STATUS_PARAMETER_SET_FAILED)
+            self.region = args[1]
+            return self.build_response(STATUS_OK)
+
+        if command == GET_RADIO_FREQUENCY[0]:
+            return self.build_response(STATUS_OK, bytes((0, self.region)))
+
+        if command in TAG_COMMANDS:
+            if not self.tags:
+                return self.build_response(STATUS_NO_TAG)
+
+            tag = self.tags[0]
+            password, bank, param = PASSWORD_BANK_PARAM.unpack_from(args)
+
+            if command == GEN2_SECURED_READ[0]:
+                data = tag.read(password, bank, param, args[PASSWORD_BANK_PARAM.size])
+                if data is None:
+                    return self.build_response(STATUS_TAG_READ_FAILED)
+                # Data is preceded by antenna number
+                return self.build_response(STATUS_OK, b"\x01" + data)
+
+            if command == GEN2_SECURED_WRITE[0]:
+                data = args[PASSWORD_BANK_PARAM.size:PASSWORD_BANK_PARAM.size + 2]
+                if len(data) != 2 or not tag.write(password, bank, param, data):
+                    return self.build_response(STATUS_TAG_WRITE_FAILED)
+                return self.build_response(STATUS_OK)
+
+            if not tag.lock(password, bank, param):
+                return self.build_response(STATUS_TAG_LOCK_FAILED)
+            return self.build_response(STATUS_OK)
+
+        return self.build_response(STATUS_GENERAL_ERROR)
+
+    def serve(self, receive, send) -> None:
+        """
+        Serve one connection until it is closed
+        :param receive: Callable receiving bytes into a writable buffer and returning their count
+        :param send: Callable writing all given bytes
+        """
+        decoder = UHFFrameDecoder(header=REQUEST_HEADER, checksum_start=1)
+        while True:
+            received = receive(decoder.writable())
+            if not received:
+                return
+            decoder.commit(received)
+
+            for frame in decoder.frames():
+                response = self.handle(frame)
+                delay = self.delay()
+                if delay:
+                    time.sleep(delay)
+                if response is None:
+                    continue
+
+                if self.segment_size:
+                    for i in range(0, len(response), self.segment_size):
+                        send(response[i:i + self.segment_size])
+                else:
+                    send(response)
+
+
+class SimulatorServer(socketserver.ThreadingTCPServer):
+    """
+    TCP server exposing :class:`ReaderSimulator`, one thread per connection
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, simulator: ReaderSimulator = None, host: str = '127.0.0.1', port: int = 0) -> None:
+        self.simulator = simulator if simulator is not None else ReaderSimulator()
+        self.thread = None
+        super().__init__((host, port), SimulatorRequestHandler)
+
+    @property
+    def host(self) -> str:
+        return self.server_address[0]
+
+    @property
+    def port(self) -> int:
+        return self.server_address[1]
+
+    def __enter__(self) -> 'SimulatorServer':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """
+        Serve in background thread
+        """
+        self.thread = threading.Thread(target=self.serve_forever, name="uhf-simulator", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Stop serving and close the listening socket
+        """
+        self.shutdown()
+        self.server_close()
+
+
+class SimulatorRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self) -> None:
+        self.request.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            self.server.simulator.serve(self.request.recv_into, self.request.sendall)
+        except OSError as exc:
+            self.server.simulator.logger.debug("Connection closed: %s", exc)
+
+
+class SimulatorSerial:
+    """
+    Pseudo terminal exposing :class:`ReaderSimulator` for serial clients, POSIX only.
+    Clients open :attr:`port_name` as they would open the real serial port.
+    """
+    def __init__(self, simulator: ReaderSimulator = None) -> None:
+        import tty
+
+        self.simulator = simulator if simulator is not None else ReaderSimulator()
+        self.master, self.slave = os.openpty()
+        tty.setraw(self.slave)
+        self.port_name = os.ttyname(self.slave)
+        self.thread = None
+
+    def __enter__(self) -> 'SimulatorSerial':
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.stop()
+
+    def start(self) -> None:
+        """
+        Serve in background thread
+        """
+        self.thread = threading.Thread(target=self.simulator.serve, args=(self.__receive, self.__send),
+                                       name="uhf-simulator-serial", daemon=True)
+        self.thread.start()
+
+    def stop(self) -> None:
+        """
+        Close the pseudo terminal
+        """
+        for fd in (self.slave, self.master):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __receive(self, buffer: memoryview) -> int:
+        try:
+            data = os.read(self.master, len(buffer))
+        except OSError:
+            return 0
+        buffer[:len(data)] = data
+        return len(data)
+
+    def __send(self, data: bytes) -> None:
+        while data:
+            data = data[os.write(self.master, data):]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="MR6100 reader simulator")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=10100)
+    parser.add_argument('--serial', action='store_true', help="serve on a pseudo terminal instead of TCP")
+    parser.add_argument('--tags', type=int, default=1, help="number of simulated tags, 0 for empty field")
+    parser.add_argument('--latency', type=float, default=0.0, help="response latency in seconds")
+    parser.add_argument('--jitter', type=float, default=0.0, help="maximum latency deviation in seconds")
+    parser.add_argument('--segment-size', type=int, default=None, help="split responses into segments")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="probability of tag command failure")
+    parser.add_argument('--drop-rate', type=float, default=0.0, help="probability of dropped response")
+    parser.add_argument('--seed', type=int, default=None)
+    options = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    simulator = ReaderSimulator(tags=[SimulatedTag() for _ in range(options.tags)], latency=options.latency,
+                                jitter=options.jitter, segment_size=options.segment_size,
+                                error_rate=options.error_rate, drop_rate=options.drop_rate, seed=options.seed)
+
+    if options.serial:
+        with SimulatorSerial(simulator) as serial:
+            simulator.logger.info("Serving on %s", serial.port_name)
+            serial.thread.join()
+    else:
+        server = SimulatorServer(simulator, options.host, options.port)
+        simulator.logger.info("Serving on %s:%s", server.host, server.port)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,283 @@
+import mmap
+import struct
+import sys
+
+from array import array
+from collections import namedtuple
+from typing import Dict, Iterator, List, Optional
+
+from .exceptions import InvalidParameterException
+from .constants import EPC, TID, USER, EPC_WORD_OFFSET
+
+# Bank images of a stored tag, trimmed to the number of bytes actually captured
+TagSnapshot = namedtuple('TagSnapshot', ['epc', 'tid', 'user'])
+
+# Magic, format version, tag count and EPC, TID and USER image widths
+HEADER = struct.Struct('<4sHIHHH')
+MAGIC = b'UHFS'
+VERSION = 1
+
+BANKS = (EPC, TID, USER)
+
+
+class TagStore:
+    """
+    Compact snapshot of many tags, e.g. collected by an audit.
+
+    EPC, TID and USER images are packed into one contiguous buffer per bank, every tag taking a row of fixed
+    `epc_size`, `tid_size` and `user_size` bytes, shorter images are padded with zeros. Tags are indexed by
+    EPC and TID, adding a tag with known EPC or TID replaces its row.
+
+    Word queries such as :meth:`where` scan a strided view of the buffer in C instead of decoding every tag.
+    A store written by :meth:`save` and opened by :meth:`load` maps the file into memory, so snapshots larger
+    than memory can be queried and only the pages touched are read. Mapped stores are copied to memory on
+    first modification.
+    """
+    def __init__(self, epc_size: int = 12, tid_size: int = 12, user_size: int = 64) -> None:
+        for size in (epc_size, tid_size, user_size):
+            if size <= 0 or size % 2:
+                raise InvalidParameterException("bank sizes must be positive and whole words")
+
+        self.widths = {EPC: epc_size, TID: tid_size, USER: user_size}
+        self.buffers = {bank: array('B') for bank in BANKS}
+        self.lengths = {bank: array('H') for bank in BANKS}
+        self.count = 0
+        self.epc_index = {}
+        self.tid_index = {}
+        self.mapping = None
+        self.views = []
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __iter__(self) -> Iterator[TagSnapshot]:
+        for row in range(self.count):
+            yield self.get(row)
+
+    def __contains__(self, identity: bytes) -> bool:
+        return identity in self.epc_index or identity in self.tid_index
+
+    def add(self, epc: bytes, tid: bytes = b"", user: bytes = b"") -> int:
+        """
+        Store tag, replacing the stored tag with the same TID or, if TID is empty, the same EPC
+        :param epc: EPC bank image
+        :param tid: TID bank image
+        :param user: USER bank image
+        :return: row number of the tag
+        """
+        images = {EPC: epc, TID: tid, USER: user}
+        for bank, image in images.items():
+            if len(image) > self.widths[bank]:
+                raise InvalidParameterException("bank {} image is longer than {} bytes".format(bank, self.widths[bank]))
+
+        self.__materialize()
+
+        row = self.tid_index.get(tid) if tid else self.epc_index.get(epc)
+        if row is None:
+            row = self.count
+            self.count += 1
+            for bank in BANKS:
+                self.buffers[bank].frombytes(bytes(self.widths[bank]))
+                self.lengths[bank].append(0)
+        else:
+            self.__unindex(row)
+
+        for bank, image in images.items():
+            width = self.widths[bank]
+            self.buffers[bank][row * width:(row + 1) * width] = array('B', image.ljust(width, b"\x00"))
+            self.lengths[bank][row] = len(image)
+
+        if epc:
+            self.epc_index[epc] = row
+        if tid:
+            self.tid_index[tid] = row
+        return row
+
+    def capture(self, reader, password: int = 0) -> int:
+        """
+        Read EPC, TID and USER banks of the tag in field and store them, the EPC image is the EPC itself
+        without the CRC and protocol control words preceding it in the bank
+        :param reader: :class:`UHFReader`
+        :param password: Access password
+        :return: row number of the tag
+        """
+        tid = reader.gen2_sec_read(password=password, bank=TID, count=self.widths[TID])
+        epc = reader.gen2_sec_read(password=password, bank=EPC, addr=EPC_WORD_OFFSET * 2, count=self.widths[EPC],
+                                   tag=tid)
+        user = reader.gen2_sec_read(password=password, bank=USER, count=self.widths[USER], tag=tid)
+        return self.add(epc, tid, user)
+
+    def get(self, row: int) -> TagSnapshot:
+        """
+        Get stored tag
+        :param row: Row number
+        :return: :class:`TagSnapshot`
+        """
+        if not 0 <= row < self.count:
+            raise IndexError("row out of range")
+        return TagSnapshot(*(self.image(row, bank) for bank in BANKS))
+
+    def image(self, row: int, bank: int) -> bytes:
+        """
+        Get bank image of stored tag
+        :param row: Row number
+        :param bank: Memory bank (`EPC`, `TID`, `USER`)
+        :return: Captured bytes of the bank
+        """
+        offset = row * self.widths[bank]
+        return bytes(memoryview(self.buffers[bank])[offset:offset + self.lengths[bank][row]])
+
+    def find_epc(self, epc: bytes) -> Optional[int]:
+        """
+        Look up tag by EPC
+        :return: row number or `None`
+        """
+        return self.epc_index.get(epc)
+
+    def find_tid(self, tid: bytes) -> Optional[int]:
+        """
+        Look up tag by TID
+        :return: row number or `None`
+        """
+        return self.tid_index.get(tid)
+
+    def column(self, bank: int, word: int) -> List[int]:
+        """
+        Get value of a word of the bank of all stored tags, words beyond the captured image read as zero
+        :param bank: Memory bank (`EPC`, `TID`, `USER`)
+        :param word: Word offset within the bank
+        :return: list of word values, indexed by row number
+        """
+        values = array('H', self.__words(bank, word).tobytes())
+        if sys.byteorder == 'little':
+            values.byteswap()
+        return values.tolist()
+
+    def where(self, bank: int, word: int, value: int) -> List[int]:
+        """
+        Find tags whose word of the bank equals the value, e.g. all tags with USER word 3 set to `0x1234`
+        :param bank: Memory bank (`EPC`, `TID`, `USER`)
+        :param word: Word offset within the bank
+        :param value: Word value
+        :return: list of row numbers
+        """
+        # Images keep words big-endian, so the packed column is searched for the raw bytes of the value
+        words = self.__words(bank, word).tobytes()
+        pattern = struct.pack('>H', value)
+
+        rows = []
+        offset = words.find(pattern)
+        while offset >= 0:
+            if offset % 2:
+                # Match straddling two words
+                offset = words.find(pattern, offset + 1)
+                continue
+            rows.append(offset // 2)
+            offset = words.find(pattern, offset + 2)
+        return rows
+
+    def __words(self, bank: int, word: int) -> memoryview:
+        width = self.widths[bank]
+        if not 0 <= word < width // 2:
+            raise InvalidParameterException("word {} is beyond bank {} image".format(word, bank))
+        # Words of the same offset are `width` bytes apart, a strided view picks them without copying rows
+        return memoryview(self.buffers[bank]).cast('B').cast('H')[word::width // 2]
+
+    def __unindex(self, row: int) -> None:
+        epc, tid = self.image(row, EPC), self.image(row, TID)
+        if self.epc_index.get(epc) == row:
+            del self.epc_index[epc]
+        if self.tid_index.get(tid) == row:
+            del self.tid_index[tid]
+
+    def __materialize(self) -> None:
+        if self.mapping is None:
+            return
+        self.buffers = {bank: array('B', buffer) for bank, buffer in self.buffers.items()}
+        self.lengths = {bank: array('H', lengths) for bank, lengths in self.lengths.items()}
+        self.close()
+
+    def save(self, path: str) -> None:
+        """
+        Write store to file
+        :param path: File path
+        """
+        with open(path, 'wb') as file:
+            file.write(HEADER.pack(MAGIC, VERSION, self.count, self.widths[EPC], self.widths[TID],
+                                   self.widths[USER]))
+            for bank in BANKS:
+                lengths = array('H', self.lengths[bank])
+                if sys.byteorder == 'big':
+                    lengths.byteswap()
+                file.write(lengths.tobytes())
+            for bank in BANKS:
+                file.write(memoryview(self.buffers[bank]).cast('B'))
+
+    @classmethod
+    def load(cls, path: str) -> 'TagStore':
+        """
+        Open store written by :meth:`save`, mapping the file into memory
+        :param path: File path
+        :return: :class:`TagStore`
+        """
+        with open(path, 'rb') as file:
+            mapping = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(mapping)
+        magic, version, count, epc_size, tid_size, user_size = HEADER.unpack_from(view)
+        if magic != MAGIC or version != VERSION:
+            view.release()
+            mapping.close()
+            raise InvalidParameterException("{} is not a tag store".format(path))
+
+        store = cls(epc_size, tid_size, user_size)
+        store.count = count
+        store.mapping = mapping
+        store.views.append(view)
+
+        offset = HEADER.size
+        for bank in BANKS:
+            lengths = array('H', view[offset:offset + count * 2].tobytes())
+            if sys.byteorder == 'big':
+                lengths.byteswap()
+            store.lengths[bank] = lengths
+            offset += count * 2
+        for bank in BANKS:
+            size = count * store.widths[bank]
+            store.buffers[bank] = view[offset:offset + size]
+            store.views.append(store.buffers[bank])
+            offset += size
+
+        for row in range(count):
+            epc, tid = store.image(row, EPC), store.image(row, TID)
+            if epc:
+                store.epc_index[epc] = row
+            if tid:
+                store.tid_index[tid] = row
+        return store
+
+    def close(self) -> None:
+        """
+        Unmap the file of a loaded store, it must not be queried afterwards
+        """
+        if self.mapping is None:
+            return
+        # Views into the mapping must be released before it can be closed, slices first
+        for view in reversed(self.views):
+            view.release()
+        self.views = []
+        self.mapping.close()
+        self.mapping = None
+
+    def __enter__(self) -> 'TagStore':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get store size
+        :return: dict with number of `tags` and `bytes` taken by bank images
+        """
+        return {'tags': self.count, 'bytes': sum(len(buffer) for buffer in self.buffers.values())}
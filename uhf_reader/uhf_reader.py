@@ -1,56 +1,193 @@
+import copy
 import os
 import socket
 import time
 
-from typing import Tuple, Any
+from typing import Tuple, Any, Iterable, Iterator, List, Callable
 
 from .request import UHFRequest, GetFirmwareVersionRequest, ResetReaderRequest, SetRadioPowerRequest, \
     GetRadioPowerRequest, SetRadioFrequencyRequest, GetRadioFrequencyRequest, Gen2SecuredReadRequest, \
     Gen2SecuredWriteRequest, Gen2SecuredLockRequest
-from .exceptions import NetworkException, InvalidParameterException
-from .constants import RADIO_FREQUENCY_EUROPE, USER, EPC, UNLOCK
+from .cache import ReaderConfigCache, FIRMWARE_VERSION, RADIO_POWER, RADIO_FREQUENCY
+from .decoder import UHFFrameDecoder
+from .exceptions import NetworkException, InvalidParameterException, InvalidPacketException, \
+    InvalidChecksumException, ErrorResponseException, VerificationException, ReceiveTimeoutException
+from .metrics import UHFMetrics
+from .planner import split_words, plan_write, plan_reads
+from .retry import RetryPolicy, DEFAULT_RETRY_POLICY
+from .watch import TagEvent, TagWatcher
+from .constants import RADIO_FREQUENCY_EUROPE, USER, EPC, UNLOCK, STATUS_NO_TAG, DEFAULT_READ_WORDS, PRIORITY_NORMAL, \
+    EPC_WORD_OFFSET
 
 
 def deferred_stub():
     return None
 
 
-try:
-    from twisted.internet import defer
-    deferred_wrapper = defer.Deferred
-except ImportError:
-    deferred_wrapper = deferred_stub
+def deferred_wrapper():
+    # Twisted is imported on first use only, synchronous clients never load it
+    try:
+        from twisted.internet import defer
+    except ImportError:
+        return deferred_stub()
+    return defer.Deferred()
 
 
 class AsyncUHFReader:
     """
     Asynchronous API implementation for Twisted
+
+    When the queue is bounded and full, requests wait until it drains, with `wait_when_full` disabled they fail
+    right away with :class:`QueueFullException` instead. Requests also fail once the queue holds as many waiting
+    requests as its `max_held` limit allows.
     """
-    def __init__(self, queue) -> None:
+    def __init__(self, queue, config_cache: ReaderConfigCache = None, read_words: int = DEFAULT_READ_WORDS,
+                 metrics: UHFMetrics = None, priority: int = PRIORITY_NORMAL, timeout: float = None,
+                 retry_policy: RetryPolicy = DEFAULT_RETRY_POLICY, wait_when_full: bool = True) -> None:
         self.queue = queue
+        self.config_cache = config_cache
+        # Settings learnt from the reader, shared with copies made by with_options() and transaction()
+        self.adaptive = {'read_words': read_words}
+        self.metrics = metrics
+        self.priority = priority
+        self.timeout = timeout
+        self.retry_policy = retry_policy
+        self.wait_when_full = wait_when_full
+
+    @property
+    def read_words(self) -> int:
+        return self.adaptive['read_words']
+
+    @read_words.setter
+    def read_words(self, value: int) -> None:
+        self.adaptive['read_words'] = value
+
+    def with_options(self, priority: int = None, timeout: float = None,
+                     wait_when_full: bool = None) -> 'AsyncUHFReader':
+        """
+        Get reader submitting requests with different scheduling options, sharing the queue and caches
+        :param priority: Request priority (`PRIORITY_HIGH`, `PRIORITY_NORMAL`, `PRIORITY_LOW`)
+        :param timeout: Seconds each request may wait in the queue before it is failed unsent
+        :param wait_when_full: Whether requests wait for a full queue to drain instead of failing
+        :return: :class:`AsyncUHFReader`
+        """
+        reader = copy.copy(self)
+        if priority is not None:
+            reader.priority = priority
+        if timeout is not None:
+            reader.timeout = timeout
+        if wait_when_full is not None:
+            reader.wait_when_full = wait_when_full
+        return reader
+
+    def wait_capacity(self):
+        """
+        Wait until the queue has room for more requests, letting producers throttle themselves
+        :return: Deferred firing with `None` once the queue is not full
+        """
+        from twisted.internet import defer
+
+        wait_capacity = getattr(self.queue, 'wait_capacity', None)
+        if wait_capacity is None:
+            return defer.succeed(None)
+        return wait_capacity()
+
+    def transaction(self, operation: Callable[..., Any], *args, **kwargs):
+        """
+        Run operation with exclusive use of the reader connection. Requests it submits are sent back to back,
+        requests of other callers wait until the Deferred returned by the operation fires or fails.
+        Transactions nested in a transaction run as part of it.
+        :param operation: Callable receiving :class:`AsyncUHFReader` bound to the session as first argument,
+            followed by `args` and `kwargs`, returning Deferred or value
+        :return: Deferred firing with the result of the operation
+        """
+        from twisted.internet import defer
+
+        open_session = getattr(self.queue, 'open_session', None)
+        if open_session is None:
+            return defer.maybeDeferred(operation, self, *args, **kwargs)
+
+        deadline = time.monotonic() + self.timeout if self.timeout is not None else None
+
+        def session_callback(session):
+            reader = copy.copy(self)
+            reader.queue = session
+
+            def release(result):
+                session.close()
+                return result
+
+            return defer.maybeDeferred(operation, reader, *args, **kwargs).addBoth(release)
+
+        return open_session(self.priority, deadline).addCallback(session_callback)
 
     def __put_request(self, request) -> Any:
         request.deferred = deferred_wrapper()
-        self.queue.put(request)
+        request.priority = self.priority
+        if self.timeout is not None:
+            request.deadline = time.monotonic() + self.timeout
+        if self.metrics is not None:
+            self.metrics.request_queued(request)
+        if self.wait_when_full:
+            self.queue.put(request)
+        else:
+            self.queue.put(request, block=False)
         return request.deferred
 
-    def get_fw_version(self):
-        return self.__put_request(GetFirmwareVersionRequest())
+    def __put_cached_request(self, key: str, request, refresh: bool) -> Any:
+        if self.config_cache is None:
+            return self.__put_request(request)
+
+        if not refresh:
+            found, result = self.config_cache.get(key)
+            if found:
+                deferred = deferred_wrapper()
+                deferred.callback(result)
+                return deferred
+
+        return self.__put_request(request).addCallback(self.__store_cached, key)
+
+    def __store_cached(self, result, key: str):
+        self.config_cache.set(key, result)
+        return result
+
+    def __invalidate_cached(self, result, key: str):
+        self.config_cache.invalidate(key)
+        return result
+
+    def __retry_later(self, failure, attempt: int, retry, *args) -> bool:
+        if self.retry_policy is None or not self.retry_policy.retryable(failure.value, attempt):
+            return False
+        from twisted.internet import reactor
+        reactor.callLater(self.retry_policy.delay(attempt), retry, *args, attempt + 1)
+        return True
+
+    def __put_invalidating_request(self, key: str, request) -> Any:
+        deferred = self.__put_request(request)
+        if self.config_cache is not None:
+            deferred.addCallback(self.__invalidate_cached, key)
+        return deferred
+
+    def get_fw_version(self, refresh: bool = False):
+        return self.__put_cached_request(FIRMWARE_VERSION, GetFirmwareVersionRequest(), refresh)
 
     def reset_reader(self):
+        if self.config_cache is not None:
+            self.config_cache.invalidate()
         return self.__put_request(ResetReaderRequest())
 
     def set_rf_power(self, power1: int = 20, power2: int = 2, power3: int = 32, power4: int = 0):
-        return self.__put_request(SetRadioPowerRequest(power1=power1, power2=power2, power3=power3, power4=power4))
+        return self.__put_invalidating_request(RADIO_POWER, SetRadioPowerRequest(power1=power1, power2=power2,
+                                                                                 power3=power3, power4=power4))
 
-    def get_rf_power(self):
-        return self.__put_request(GetRadioPowerRequest())
+    def get_rf_power(self, refresh: bool = False):
+        return self.__put_cached_request(RADIO_POWER, GetRadioPowerRequest(), refresh)
 
     def set_rf_channel(self, region=RADIO_FREQUENCY_EUROPE):
-        return self.__put_request(SetRadioFrequencyRequest(region=region))
+        return self.__put_invalidating_request(RADIO_FREQUENCY, SetRadioFrequencyRequest(region=region))
 
-    def get_rf_channel(self):
-        return self.__put_request(GetRadioFrequencyRequest())
+    def get_rf_channel(self, refresh: bool = False):
+        return self.__put_cached_request(RADIO_FREQUENCY, GetRadioFrequencyRequest(), refresh)
 
     def gen2_sec_lock(self, password: int = 0, bank: int = USER, level: int = UNLOCK):
         return self.__put_request(Gen2SecuredLockRequest(password=password, bank=bank, level=level))
@@ -61,59 +198,127 @@ class AsyncUHFReader:
     def gen2_sec_read(self, password: int = 0, bank: int = EPC, addr: int = 0, count: int = 4):
         return self.__put_request(Gen2SecuredReadRequest(password=password, bank=bank, addr=addr, count=count))
 
-    def gen2_sec_write_ex(self, data: bytes, password: int = 0, bank: int = USER):
-        if len(data) == 0:
-            return
-        if len(data) % 2 != 0:
-            data += b"\x00"
-        chunks = [data[i:i + 2] for i in range(0, len(data), 2)]
-
+    def __write_words(self, words, password: int, bank: int, progress: Callable[[int, int], None] = None):
         deferred = deferred_wrapper()
 
-        def chunk_write_callback(result):
-            request, response = result
-            if request.addr < len(chunks) - 1:
-                self.gen2_sec_write(chunks[request.addr + 1], password=password, bank=bank, addr=request.addr + 1) \
-                    .addCallbacks(chunk_write_callback, chunk_write_error)
+        if not words:
+            deferred.callback(None)
+            return deferred
+
+        def word_write_callback(result, idx):
+            if progress is not None:
+                progress((idx + 1) * 2, len(words) * 2)
+            if idx < len(words) - 1:
+                write_word(idx + 1)
             else:
-                deferred.callback((request, response))
+                deferred.callback(result)
 
-        def chunk_write_error(failure):
-            deferred.errback(failure)
+        def word_write_error(failure, idx, attempt):
+            if not self.__retry_later(failure, attempt, write_word, idx):
+                deferred.errback(failure)
 
-        self.gen2_sec_write(chunks[0], password=password, bank=bank, addr=0) \
-            .addCallbacks(chunk_write_callback, chunk_write_error)
+        def write_word(idx, attempt=0):
+            word, chunk = words[idx]
+            self.gen2_sec_write(chunk, password=password, bank=bank, addr=word) \
+                .addCallbacks(word_write_callback, word_write_error, callbackArgs=(idx,), errbackArgs=(idx, attempt))
 
-        return deferred
+        write_word(0)
 
-    def gen2_sec_read_ex(self, password: int = 0, bank: int = EPC, addr: int = 0, count: int = 16):
-        deferred = deferred_wrapper()
-        accumulator = b""
+        return deferred
 
+    def gen2_sec_write_ex(self, data: bytes, password: int = 0, bank: int = USER, addr: int = 0,
+                          progress: Callable[[int, int], None] = None):
+        if len(data) == 0:
+            return
+        words = split_words(data, addr)
+        return self.transaction(lambda reader: reader.__write_words(words, password, bank, progress))
+
+    def gen2_sec_update_ex(self, data: bytes, password: int = 0, bank: int = USER, addr: int = 0,
+                           verify: bool = True):
+        # Reads and writes go back to back, so no other request changes the tag in between
+        return self.transaction(lambda reader: reader.__update(data, password, bank, addr, verify))
+
+    def __update(self, data: bytes, password: int, bank: int, addr: int, verify: bool):
+        size = len(data)
+        words = []
+
+        def current_read_callback(current):
+            nonlocal data
+            if size % 2 != 0:
+                # Complete the last word with the byte already on the tag, it must not change
+                data += current[-1:]
+            words.extend(plan_write(current, data, addr))
+            return self.__write_words(words, password, bank)
+
+        def verify_callback(_):
+            if not verify or not words:
+                return data[:size]
+            return self.gen2_sec_read_ex(password=password, bank=bank, addr=addr, count=len(data)) \
+                .addCallback(verify_read_callback)
+
+        def verify_read_callback(actual):
+            if actual != data:
+                raise VerificationException(data, actual)
+            return actual[:size]
+
+        return self.gen2_sec_read_ex(password=password, bank=bank, addr=addr, count=size + size % 2) \
+            .addCallback(current_read_callback) \
+            .addCallback(verify_callback)
+
+    def gen2_sec_read_ex(self, password: int = 0, bank: int = EPC, addr: int = 0, count: int = 16,
+                         progress: Callable[[int, int], None] = None):
         if count == 0:
+            deferred = deferred_wrapper()
             deferred.callback(b"")
             return deferred
 
         if addr < 0:
             raise InvalidParameterException("addr must be positive integer")
 
+        return self.transaction(lambda reader: reader.__read_chunks(password, bank, addr, count, progress))
+
+    def __read_chunks(self, password: int, bank: int, addr: int, count: int, progress: Callable[[int, int], None]):
+        deferred = deferred_wrapper()
+        accumulator = b""
+        end = addr + count
+        read_words = self.read_words
+
+        def read_chunk(offset, attempt=0):
+            # Whole 8-byte blocks up to the request size
+            words = min(max(read_words // 4, 1), (end - offset + 7) // 8) * 4
+            self.gen2_sec_read(password=password, bank=bank, addr=offset // 2, count=words) \
+                .addCallbacks(chunk_read_callback, chunk_read_error, errbackArgs=(offset, words, attempt))
+
         def chunk_read_callback(result):
             nonlocal accumulator
 
             request, response = result
             accumulator += response.value()
+            if progress is not None:
+                progress(len(accumulator), (end + 7) // 8 * 8 - addr // 8 * 8)
 
-            if request.addr * 2 + 8 < addr + count:
-                self.gen2_sec_read(password=password, bank=bank, addr=request.addr + 4) \
-                    .addCallbacks(chunk_read_callback, chunk_read_error)
+            if request.addr * 2 + request.count * 2 < end:
+                read_chunk(request.addr * 2 + request.count * 2)
             else:
+                # Smaller reads succeeded where larger ones failed, keep using them
+                if read_words < self.read_words:
+                    self.read_words = read_words
                 deferred.callback(accumulator[addr % 8:addr % 8 + count])
 
-        def chunk_read_error(failure):
-            deferred.errback(failure)
+        def chunk_read_error(failure, offset, words, attempt):
+            nonlocal read_words
+
+            if self.__retry_later(failure, attempt, read_chunk, offset):
+                return
+            # Reader or tag may not support reads this large, retry with smaller ones
+            if words > DEFAULT_READ_WORDS and failure.check(ErrorResponseException) \
+                    and failure.value.code != STATUS_NO_TAG:
+                read_words = words // 8 * 4
+                read_chunk(offset)
+            else:
+                deferred.errback(failure)
 
-        self.gen2_sec_read(password=password, bank=bank, addr=8 * (addr // 8) // 2).addCallbacks(chunk_read_callback,
-                                                                                                 chunk_read_error)
+        read_chunk(8 * (addr // 8))
 
         return deferred
 
@@ -124,24 +329,47 @@ class UHFReader:
     """
     buffer_size = 8192
     connection = None
+    decoder = None
     timeout = 5.0
     host = None
     port = 100
+    pipeline_window = 1
+    pipelining = True
+    drain_timeout = 0.2
+    config_cache = None
+    block_cache = None
+    read_words = DEFAULT_READ_WORDS
+    metrics = None
+    retry_policy = DEFAULT_RETRY_POLICY
 
     def __init__(self, *args, **kwargs):
         if len(kwargs):
             self.timeout = kwargs.get('timeout', self.timeout)
             self.host = kwargs.get('host', self.host)
             self.port = kwargs.get('port', self.port)
+            self.pipeline_window = kwargs.get('pipeline_window', self.pipeline_window)
+            self.config_cache = kwargs.get('config_cache', self.config_cache)
+            self.block_cache = kwargs.get('block_cache', self.block_cache)
+            self.read_words = kwargs.get('read_words', self.read_words)
+            self.metrics = kwargs.get('metrics', self.metrics)
+            self.retry_policy = kwargs.get('retry_policy', self.retry_policy)
 
     def connect(self) -> None:
         """
         Open connection to the reader
         """
+        if self.config_cache is not None:
+            self.config_cache.invalidate()
+
         try:
             self.connection = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            # Frames are tiny and latency bound, do not wait to coalesce them
+            self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
             self.connection.settimeout(self.timeout)
             self.connection.connect((self.host, self.port))
+            self.decoder = UHFFrameDecoder(self.buffer_size)
+            self.pipelining = True
         except Exception as exc:
             raise NetworkException("failed to connect: " + str(exc))
 
@@ -154,26 +382,40 @@ class UHFReader:
         except Exception as exc:
             raise NetworkException("failed to disconnect: " + str(exc))
 
+    def __enter__(self) -> 'UHFReader':
+        self.connect()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.disconnect()
+
     def get_response(self) -> bytes:
         """
         Get reader response
-        :return: bytes
-        :raises: :class:`InvalidChecksumException`, :class:`ErrorResponseException`, :class:`InvalidPacketException`
+        :return: bytes of a single complete response frame
+        :raises: :class:`ReceiveTimeoutException` if no complete frame arrives in time, :class:`NetworkException`
         """
-        data = None
-
         deadline = time.time() + self.timeout
-        while data is None:
+        while True:
+            frame = self.decoder.get_frame()
+            if frame is not None:
+                return frame
+
             if time.time() >= deadline:
-                raise NetworkException("receive timed out")
+                raise ReceiveTimeoutException("receive timed out")
 
             try:
                 self.connection.settimeout(deadline - time.time())
-                data = self.connection.recv(self.buffer_size)
+                received = self.connection.recv_into(self.decoder.writable())
+            except socket.timeout:
+                raise ReceiveTimeoutException("receive timed out")
             except Exception as exc:
                 raise NetworkException("failed to receive: " + str(exc))
 
-        return data
+            if received == 0:
+                raise NetworkException("connection closed by reader")
+
+            self.decoder.commit(received)
 
     def send_request(self, request: UHFRequest) -> None:
         """
@@ -187,21 +429,172 @@ class UHFReader:
             raise NetworkException("failed to send: " + str(exc))
 
     def send_request_return_response(self, request) -> Any:
+        if self.metrics is not None:
+            self.metrics.request_sent(request)
         self.send_request(request)
-        return request.parse_response(self.get_response()).value()
+        return self.__receive_value(request)
 
-    def get_fw_version(self) -> Tuple[int, int]:
+    def __receive_value(self, request: UHFRequest) -> Any:
+        if self.metrics is None:
+            return request.parse_response(self.get_response()).value()
+
+        try:
+            frame = self.get_response()
+            self.metrics.response_received(request)
+            value = request.parse_response(frame).value()
+        except Exception as exc:
+            self.metrics.request_failed(request, exc)
+            raise
+
+        self.metrics.response_parsed(request)
+        return value
+
+    def send_many(self, requests: Iterable[UHFRequest], window: int = None,
+                  callback: Callable[[UHFRequest, Any], None] = None) -> List[Any]:
+        """
+        Send requests back to back in windows of up to `window` requests and match responses in order.
+        Results of a window are only returned once all its requests are answered. If the reader does not answer
+        pipelined requests properly, e.g. skips a response, results of the window are discarded, pipelining is
+        disabled until the next :meth:`connect` and the window is resent one request at a time.
+        :param requests: Prebuilt :class:`UHFRequest` objects
+        :param window: Maximum number of requests in flight, defaults to `pipeline_window`
+        :param callback: Called with each request and its response value once its window is answered
+        :return: list of response values in request order
+        :raises: :class:`ErrorResponseException` for the first failed request, after draining the pipeline
+        """
+        requests = list(requests)
+        if window is None:
+            window = self.pipeline_window
+        if window < 1:
+            raise InvalidParameterException("window must be positive integer")
+
+        results = []
+        while len(results) < len(requests):
+            batch = requests[len(results):len(results) + (window if self.pipelining else 1)]
+            if self.metrics is not None:
+                for request in batch:
+                    self.metrics.request_sent(request)
+                self.metrics.set_in_flight("{}:{}".format(self.host, self.port), len(batch))
+            try:
+                self.connection.sendall(b"".join(request.data for request in batch))
+            except Exception as exc:
+                raise NetworkException("failed to send: " + str(exc))
+
+            values = []
+            try:
+                for request in batch:
+                    values.append(self.__receive_value(request))
+            except ErrorResponseException:
+                # Responses to the rest of the window must still arrive, otherwise the error may be another's
+                if not self.__discard_responses(len(batch) - len(values) - 1):
+                    self.pipelining = False
+                    continue
+                self.__deliver(batch, values, results, callback)
+                raise
+            except (NetworkException, InvalidPacketException, InvalidChecksumException, IndexError):
+                if len(batch) == 1:
+                    raise
+                # Reader got out of step with the pipeline, resend the window one by one
+                self.pipelining = False
+                self.__drain()
+                continue
+
+            self.__deliver(batch, values, results, callback)
+
+        if self.metrics is not None:
+            self.metrics.set_in_flight("{}:{}".format(self.host, self.port), 0)
+
+        return results
+
+    @staticmethod
+    def __deliver(batch: List[UHFRequest], values: List[Any], results: List[Any],
+                  callback: Callable[[UHFRequest, Any], None]) -> None:
+        for request, value in zip(batch, values):
+            results.append(value)
+            if callback is not None:
+                callback(request, value)
+
+    def __discard_responses(self, count: int) -> bool:
+        for _ in range(count):
+            try:
+                self.get_response()
+            except NetworkException:
+                self.__drain()
+                return False
+        return True
+
+    def __drain(self) -> None:
+        self.decoder.reset()
+        try:
+            self.connection.settimeout(self.drain_timeout)
+            while self.connection.recv_into(self.decoder.writable()):
+                self.decoder.reset()
+        except socket.timeout:
+            pass
+        except Exception as exc:
+            raise NetworkException("failed to receive: " + str(exc))
+
+    def transfer(self, requests: Iterable[UHFRequest], callback: Callable[[UHFRequest, Any], None] = None,
+                 window: int = None) -> List[Any]:
+        """
+        Send requests pipelined like :meth:`send_many`, retrying requests failed with transient tag errors
+        according to `retry_policy`. Requests answered before the failure are not sent again.
+        :param requests: Prebuilt :class:`UHFRequest` objects
+        :param callback: Called with each request and its response value once its window is answered
+        :param window: Maximum number of requests in flight, defaults to `pipeline_window`
+        :return: list of response values in request order
+        :raises: :class:`ErrorResponseException` once retries are exhausted
+        """
+        requests = list(requests)
+        results = []
+        attempt = 0
+
+        def received(request, value):
+            nonlocal attempt
+            results.append(value)
+            attempt = 0
+            if callback is not None:
+                callback(request, value)
+
+        while len(results) < len(requests):
+            try:
+                self.send_many(requests[len(results):], window, received)
+            except ErrorResponseException as exc:
+                if self.retry_policy is None or not self.retry_policy.retryable(exc, attempt):
+                    raise
+                time.sleep(self.retry_policy.delay(attempt))
+                attempt += 1
+
+        return results
+
+    def __cached_request_return_response(self, key: str, request: UHFRequest, refresh: bool) -> Any:
+        if self.config_cache is None:
+            return self.send_request_return_response(request)
+
+        if not refresh:
+            found, value = self.config_cache.get(key)
+            if found:
+                return value
+
+        value = self.send_request_return_response(request)
+        self.config_cache.set(key, value)
+        return value
+
+    def get_fw_version(self, refresh: bool = False) -> Tuple[int, int]:
         """
         Gets reader firmware version
+        :param refresh: Query the reader even if the value is cached
         :rtype: object
         :return: tuple with major & minor version, e.g. `(6, 3)`
         """
-        return self.send_request_return_response(GetFirmwareVersionRequest())
+        return self.__cached_request_return_response(FIRMWARE_VERSION, GetFirmwareVersionRequest(), refresh)
 
     def reset_reader(self) -> None:
         """
         Reset the reader
         """
+        if self.config_cache is not None:
+            self.config_cache.invalidate()
         self.send_request(ResetReaderRequest())
 
     def set_rf_power(self, power1: int = 20, power2: int = 2, power3: int = 32, power4: int = 0) -> None:
@@ -214,13 +607,16 @@ class UHFReader:
         """
         self.send_request_return_response(SetRadioPowerRequest(power1=power1, power2=power2,
                                                                power3=power3, power4=power4))
+        if self.config_cache is not None:
+            self.config_cache.set(RADIO_POWER, (power1, power2, power3, power4))
 
-    def get_rf_power(self) -> Tuple[int, int, int, int]:
+    def get_rf_power(self, refresh: bool = False) -> Tuple[int, int, int, int]:
         """
         Get RF transmit power setting for reader antennas (0-30 dBm). Not all antennas may be present.
+        :param refresh: Query the reader even if the value is cached
         :return: tuple with current RF transmit power for each antenna, e.g. `(20, 2, 30, 0)`
         """
-        return self.send_request_return_response(GetRadioPowerRequest())
+        return self.__cached_request_return_response(RADIO_POWER, GetRadioPowerRequest(), refresh)
 
     def set_rf_channel(self, region: int = RADIO_FREQUENCY_EUROPE) -> None:
         """
@@ -228,52 +624,112 @@ class UHFReader:
         :param region: `RADIO_FREQUENCY_CHINA`, `RADIO_FREQUENCY_USA` or `RADIO_FREQUENCY_EUROPE`
         """
         self.send_request_return_response(SetRadioFrequencyRequest(region))
+        if self.config_cache is not None:
+            self.config_cache.set(RADIO_FREQUENCY, region)
 
-    def get_rf_channel(self) -> int:
+    def get_rf_channel(self, refresh: bool = False) -> int:
         """
         Get current RF frequency region setting
+        :param refresh: Query the reader even if the value is cached
         :return: `RADIO_FREQUENCY_CHINA`, `RADIO_FREQUENCY_USA`, `RADIO_FREQUENCY_EUROPE` or `RADIO_FREQUENCY_CUSTOM`
         """
-        return self.send_request_return_response(GetRadioFrequencyRequest())
-
-    def __gen2_sec_read(self, password: int = 0, bank: int = EPC, addr: int = 0, count: int = 4) -> bytes:
-        return self.send_request_return_response(Gen2SecuredReadRequest(password=password, bank=bank,
-                                                                        addr=addr, count=count))
+        return self.__cached_request_return_response(RADIO_FREQUENCY, GetRadioFrequencyRequest(), refresh)
 
-    def __gen2_sec_write(self, data: bytes, password: int = 0, bank: int = USER, addr: int = 0) -> bytes:
-        return self.send_request_return_response(Gen2SecuredWriteRequest(data, password=password, bank=bank, addr=addr))
+    def __invalidate_blocks(self, tag: bytes, bank: int) -> None:
+        if tag is not None and self.block_cache is not None:
+            self.block_cache.invalidate(tag, bank)
 
-    def gen2_sec_lock(self, password: int = 0, bank: int = USER, level: int = UNLOCK) -> None:
+    def gen2_sec_lock(self, password: int = 0, bank: int = USER, level: int = UNLOCK, tag: bytes = None) -> None:
         """
         Lock/unlock given memory bank using specified locking level
         :param password: Access password
         :param bank: Memory bank to lock/unlock (`RESERVED`, `EPC`, `TID`, `USER`)
         :param level: Lock level (`UNLOCK`, `UNLOCK_FOREVER`, `SECURE_LOCK`, `LOCK_FOREVER`)
+        :param tag: Tag identity (EPC or TID) to invalidate in block cache
         """
-        self.send_request_return_response(Gen2SecuredLockRequest(password=password, bank=bank, level=level))
+        try:
+            self.send_request_return_response(Gen2SecuredLockRequest(password=password, bank=bank, level=level))
+        finally:
+            self.__invalidate_blocks(tag, bank)
 
-    def gen2_sec_write(self, data: bytes, password: int = 0, bank: int = USER) -> None:
+    def gen2_sec_write(self, data: bytes, password: int = 0, bank: int = USER, tag: bytes = None,
+                       addr: int = 0, progress: Callable[[int, int], None] = None) -> None:
         """
-        Write data to given memory bank
+        Write data to given memory bank. Words failing with transient tag errors are retried
+        according to `retry_policy`.
         :param data: Data to write
         :param password: Access password
         :param bank: Memory bank to write into (`RESERVED`, `EPC`, `TID`, `USER`)
+        :param tag: Tag identity (EPC or TID) to invalidate in block cache
+        :param addr: Start byte offset, must be even
+        :param progress: Called with bytes written so far and total bytes after each written word
         """
         if len(data) == 0:
             return
-        if len(data) % 2 != 0:
-            data += b"\x00"
-        chunks = [data[i:i + 2] for i in range(0, len(data), 2)]
-        for idx, chunk in enumerate(chunks):
-            self.__gen2_sec_write(chunk, password=password, bank=bank, addr=idx)
+        self.__write_words(split_words(data, addr), password, bank, tag, progress)
+
+    def __write_words(self, words, password: int, bank: int, tag: bytes,
+                      progress: Callable[[int, int], None] = None) -> None:
+        written = 0
 
-    def gen2_sec_read(self, password: int = 0, bank: int = EPC, addr: int = 0, count: int = 16) -> bytes:
+        def word_written(request, value):
+            nonlocal written
+            written += 2
+            if progress is not None:
+                progress(written, len(words) * 2)
+
+        try:
+            self.transfer([Gen2SecuredWriteRequest(chunk, password=password, bank=bank, addr=word)
+                             for word, chunk in words], word_written)
+        finally:
+            self.__invalidate_blocks(tag, bank)
+
+    def gen2_sec_update(self, data: bytes, password: int = 0, bank: int = USER, addr: int = 0,
+                        verify: bool = True, tag: bytes = None) -> int:
         """
-        Read data from given memory bank
+        Write data to given memory bank, skipping words which already hold the desired value
+        :param data: Data to write
+        :param password: Access password
+        :param bank: Memory bank to write into (`RESERVED`, `EPC`, `TID`, `USER`)
+        :param addr: Start byte offset, must be even
+        :param verify: Read the data back once all words are written and compare
+        :param tag: Tag identity (EPC or TID) to invalidate in block cache
+        :return: Number of words written
+        :raises: :class:`VerificationException` if the read back data differs
+        """
+        if len(data) == 0:
+            return 0
+
+        current = self.gen2_sec_read(password=password, bank=bank, addr=addr, count=len(data) + len(data) % 2)
+        if len(data) % 2 != 0:
+            # Complete the last word with the byte already on the tag, it must not change
+            data += current[-1:]
+        words = plan_write(current, data, addr)
+        if words:
+            self.__write_words(words, password, bank, tag)
+
+        # Nothing written means the current contents are already verified
+        if verify and words:
+            actual = self.gen2_sec_read(password=password, bank=bank, addr=addr, count=len(data))
+            if actual != data:
+                raise VerificationException(data, actual)
+
+        return len(words)
+
+    def gen2_sec_read(self, password: int = 0, bank: int = EPC, addr: int = 0, count: int = 16,
+                      tag: bytes = None, progress: Callable[[int, int], None] = None) -> bytes:
+        """
+        Read data from given memory bank in requests of up to `read_words` words. Chunks failing with transient
+        tag errors are retried according to `retry_policy`. If the reader or tag rejects reads that large, the
+        rest is read with requests half the size, which are used for subsequent reads once the whole read
+        succeeded. :meth:`probe_read_words` finds the largest size again.
         :param password: Access password
         :param bank: Memory bank to read from (`RESERVED`, `EPC`, `TID`, `USER`)
         :param addr: Start byte offset
         :param count: Count of bytes to read
+        :param tag: Tag identity (EPC or TID) to look up and store read blocks in block cache
+        :param progress: Called with bytes read so far and total bytes to read after each read chunk,
+            cached blocks are not counted
         :return: Bytes read from the specified memory bank
         """
         result = b""
@@ -284,22 +740,246 @@ class UHFReader:
         if addr < 0:
             raise InvalidParameterException("addr must be positive integer")
 
-        # Read minimal number of 8-byte blocks containing requested data
-        for i in range(8 * (addr // 8), addr + count, 8):
-            result += self.__gen2_sec_read(password=password, bank=bank, addr=i // 2)
+        # Minimal range of 8-byte blocks containing requested data
+        blocks = range(addr // 8, (addr + count - 1) // 8 + 1)
+        cache = self.block_cache if tag is not None else None
+
+        data = {}
+        if cache is not None:
+            for block in blocks:
+                value = cache.get(tag, bank, block)
+                if value is not None:
+                    data[block] = value
+
+        def block_read(block, value):
+            data[block] = value
+            # Stored right away, so blocks read before a failure are not read again by the next call
+            if cache is not None and len(value) == cache.block_size:
+                cache.put(tag, bank, block, value)
+
+        missing = [block for block in blocks if block not in data]
+        self.__read_blocks(missing, password, bank, block_read, progress)
+
+        result = b"".join(data[block] for block in blocks)
 
         # Slice requested chunk from the possibly larger read chunk
         return result[addr % 8:addr % 8 + count]
 
-    def write_epc(self, password: int = 0, data: bytes = b"") -> None:
+    def __read_blocks(self, blocks: List[int], password: int, bank: int, callback: Callable[[int, bytes], None],
+                      progress: Callable[[int, int], None] = None) -> None:
+        done = 0
+
+        def chunk_read(request, value):
+            nonlocal done
+            for i in range(request.count // 4):
+                callback(request.addr // 4 + i, value[i * 8:i * 8 + 8])
+                done += 1
+            if progress is not None:
+                progress(done * 8, len(blocks) * 8)
+
+        blocks_per_request = max(self.read_words // 4, 1)
+        while done < len(blocks):
+            reads = plan_reads(blocks[done:], blocks_per_request)
+            try:
+                self.transfer([Gen2SecuredReadRequest(password=password, bank=bank, addr=first * 4,
+                                                        count=size * 4) for first, size in reads], chunk_read)
+            except ErrorResponseException as exc:
+                if blocks_per_request == 1 or exc.code == STATUS_NO_TAG:
+                    raise
+                # Reader or tag may not support reads this large, retry remaining blocks with smaller ones
+                blocks_per_request //= 2
+
+        # Smaller reads succeeded where larger ones failed, keep using them
+        if blocks_per_request < max(self.read_words // 4, 1):
+            self.read_words = blocks_per_request * 4
+
+    def probe_read_words(self, password: int = 0, bank: int = EPC, addr: int = 0,
+                         candidates: Iterable[int] = (32, 16, 8)) -> int:
+        """
+        Find the largest number of words the reader and the tag in field return for a single read request
+        and use it for subsequent reads
+        :param password: Access password
+        :param bank: Memory bank to probe
+        :param addr: Start byte offset, the bank must be readable for candidate sizes starting from it
+        :param candidates: Word counts to try, in descending order
+        :return: Word count now used for reads
+        """
+        for words in candidates:
+            try:
+                self.send_request_return_response(Gen2SecuredReadRequest(password=password, bank=bank,
+                                                                         addr=addr // 2, count=words))
+            except ErrorResponseException:
+                continue
+            self.read_words = words
+            return words
+
+        self.read_words = DEFAULT_READ_WORDS
+        return self.read_words
+
+    def write_epc(self, password: int = 0, data: bytes = b"", tag: bytes = None) -> None:
         """
         Write specified or random data to EPC bits 96-128 to make EPC unique
         :param password: Access password
         :param data: Data to write (bytes of length 4)
+        :param tag: Tag identity (EPC or TID) to invalidate in block cache
         """
         if len(data) != 4:
             raise InvalidParameterException("data must be exactly 4 bytes long if specified")
         if len(data) == 0:
             data = os.urandom(4)
-        self.__gen2_sec_write(data[0:2], password=password, bank=EPC, addr=6)
-        self.__gen2_sec_write(data[2:4], password=password, bank=EPC, addr=7)
+        try:
+            self.send_many([Gen2SecuredWriteRequest(data[0:2], password=password, bank=EPC, addr=6),
+                            Gen2SecuredWriteRequest(data[2:4], password=password, bank=EPC, addr=7)])
+        finally:
+            self.__invalidate_blocks(tag, EPC)
+
+    def watch(self, password: int = 0, epc_words: int = 6, watcher: TagWatcher = None) -> Iterator[TagEvent]:
+        """
+        Poll the field and yield deduplicated arrive and depart events of tags until closed. Deduplication
+        window and polling interval are set by `watcher`.
+        :param password: Access password
+        :param epc_words: Length of EPC in words
+        :param watcher: :class:`TagWatcher`, one with default settings if not specified
+        :return: iterator of :class:`TagEvent`
+        """
+        watcher = watcher if watcher is not None else TagWatcher()
+        while True:
+            request = Gen2SecuredReadRequest(password=password, bank=EPC, addr=EPC_WORD_OFFSET, count=epc_words)
+            try:
+                epc = self.send_request_return_response(request)
+            except ErrorResponseException as exc:
+                if exc.code != STATUS_NO_TAG:
+                    # Tag may still be in field, only tags not seen within the window depart
+                    events = watcher.expire(time.monotonic())
+                else:
+                    events = watcher.observe(None, time.monotonic())
+            else:
+                events = watcher.observe(bytes(epc), time.monotonic())
+
+            for event in events:
+                yield event
+            time.sleep(watcher.adapt(bool(events)))
+
+
+class ManagedUHFReader(UHFReader):
+    """
+    Synchronous TCP client managing its connection: connects lazily on first use, re-establishes lost
+    connections with exponential backoff and probes connections idle for longer than `keepalive_interval`
+    before using them.
+    """
+    initial_delay = 0.5
+    factor = 1.5
+    max_delay = 5.0
+    max_attempts = 5
+    keepalive_interval = 30.0
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if len(kwargs):
+            self.initial_delay = kwargs.get('initial_delay', self.initial_delay)
+            self.factor = kwargs.get('factor', self.factor)
+            self.max_delay = kwargs.get('max_delay', self.max_delay)
+            self.max_attempts = kwargs.get('max_attempts', self.max_attempts)
+            self.keepalive_interval = kwargs.get('keepalive_interval', self.keepalive_interval)
+
+        self.last_activity = None
+        self.__depth = 0
+
+    def __enter__(self) -> 'ManagedUHFReader':
+        return self
+
+    def disconnect(self) -> None:
+        """
+        Close connection to the reader, the next operation connects again
+        """
+        if self.connection is None:
+            return
+        try:
+            super().disconnect()
+        finally:
+            self.connection = None
+
+    def reconnect(self) -> None:
+        """
+        Drop current connection and connect again, retrying with exponential backoff
+        :raises: :class:`NetworkException` if all attempts failed
+        """
+        try:
+            self.disconnect()
+        except NetworkException:
+            pass
+
+        delay = self.initial_delay
+        for attempt in range(self.max_attempts):
+            try:
+                self.connect()
+                self.last_activity = time.monotonic()
+                return
+            except NetworkException:
+                self.connection = None
+                if attempt == self.max_attempts - 1:
+                    raise
+                time.sleep(delay)
+                delay = min(delay * self.factor, self.max_delay)
+
+    def keepalive(self) -> None:
+        """
+        Probe the connection with firmware version request, reconnecting if the reader does not respond
+        """
+        self.__depth += 1
+        try:
+            super().send_request_return_response(GetFirmwareVersionRequest())
+            self.last_activity = time.monotonic()
+        except NetworkException:
+            self.reconnect()
+        finally:
+            self.__depth -= 1
+
+    def ensure_connected(self) -> None:
+        """
+        Connect if not connected yet, probe the connection if it was idle for too long
+        """
+        if self.connection is None:
+            self.reconnect()
+        elif self.keepalive_interval is not None and self.last_activity is not None \
+                and time.monotonic() - self.last_activity > self.keepalive_interval:
+            self.keepalive()
+
+    def __call(self, method, *args, **kwargs) -> Any:
+        # Nested calls, e.g. send_request from send_request_return_response, run inside the outer retry
+        if self.__depth:
+            return method(*args, **kwargs)
+
+        self.__depth += 1
+        try:
+            self.ensure_connected()
+            try:
+                result = method(*args, **kwargs)
+            except NetworkException:
+                self.reconnect()
+                result = method(*args, **kwargs)
+            self.last_activity = time.monotonic()
+            return result
+        finally:
+            self.__depth -= 1
+
+    def send_request(self, request: UHFRequest) -> None:
+        return self.__call(super().send_request, request)
+
+    def send_request_return_response(self, request) -> Any:
+        return self.__call(super().send_request_return_response, request)
+
+    def send_many(self, requests: Iterable[UHFRequest], window: int = None,
+                  callback: Callable[[UHFRequest, Any], None] = None) -> List[Any]:
+        requests = list(requests)
+        send_many = super().send_many
+        results = []
+
+        def received(request, value):
+            results.append(value)
+            if callback is not None:
+                callback(request, value)
+
+        # Requests answered before the connection was lost are not sent again after reconnecting
+        self.__call(lambda: send_many(requests[len(results):], window, received))
+        return results
@@ -0,0 +1,83 @@
+from collections import namedtuple
+from typing import List, Optional
+
+from .exceptions import InvalidParameterException
+from .constants import TAG_ARRIVED, TAG_DEPARTED
+
+# Presence change of a tag: `kind` is `TAG_ARRIVED` or `TAG_DEPARTED`, `time` is :func:`time.monotonic` time
+# the change was detected at
+TagEvent = namedtuple('TagEvent', ['kind', 'epc', 'time'])
+
+
+class TagWatcher:
+    """
+    Presence tracker turning periodic reads of the tag in field into arrive and depart events, used by
+    `watch()` of the readers.
+
+    A tag is present from the first read returning its EPC until it was not read for `window` seconds,
+    so repeated reads are suppressed and a tag missing a few reads does not depart and arrive again.
+
+    The polling interval adapts to activity: it drops to `min_interval` whenever a tag arrives or departs and
+    grows by `factor` up to `max_interval` while nothing changes. While tags are present it is kept below
+    half of `window`, so a tag still in field is read again before it is considered gone.
+    """
+    window = 0.5
+    min_interval = 0.02
+    max_interval = 0.5
+    factor = 1.5
+
+    def __init__(self, window: float = None, min_interval: float = None, max_interval: float = None,
+                 factor: float = None) -> None:
+        if window is not None:
+            self.window = window
+        if min_interval is not None:
+            self.min_interval = min_interval
+        if max_interval is not None:
+            self.max_interval = max_interval
+        if factor is not None:
+            self.factor = factor
+        if not 0 < self.min_interval <= self.max_interval:
+            raise InvalidParameterException("min_interval must be positive and not above max_interval")
+
+        self.present = {}
+        self.interval = self.min_interval
+
+    def observe(self, epc: Optional[bytes], now: float) -> List[TagEvent]:
+        """
+        Account for a read of the field
+        :param epc: EPC of the tag read or `None` if the field was empty
+        :param now: :func:`time.monotonic` time of the read
+        :return: list of :class:`TagEvent`
+        """
+        events = []
+        if epc is not None:
+            if epc not in self.present:
+                events.append(TagEvent(TAG_ARRIVED, epc, now))
+            self.present[epc] = now
+        return events + self.expire(now)
+
+    def expire(self, now: float) -> List[TagEvent]:
+        """
+        Depart tags not read within the window, e.g. after a read which failed without telling
+        whether a tag is in field
+        :param now: :func:`time.monotonic` time
+        :return: list of :class:`TagEvent`
+        """
+        departed = [epc for epc, seen in self.present.items() if now - seen > self.window]
+        for epc in departed:
+            del self.present[epc]
+        return [TagEvent(TAG_DEPARTED, epc, now) for epc in departed]
+
+    def adapt(self, changed: bool) -> float:
+        """
+        Adjust polling interval
+        :param changed: Whether the last read produced any event
+        :return: Seconds to wait before the next read
+        """
+        if changed:
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.interval * self.factor, self.max_interval)
+        if self.present:
+            self.interval = min(self.interval, self.window / 2)
+        return self.interval